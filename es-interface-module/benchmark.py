@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+This script contains benchmarks for the ElasticsearchInterface module
+
+serializers: builds _bulk request bodies from generated documents with every
+available serializer, and from pre-serialized JSON lines, then decodes a matching
+_bulk response. No cluster is needed.
+
+interface: loads a dataset and times single-document indexing, the field and
+element mutators, get, mget, search, count and full-index reads at one or more
+concurrency levels. Runs against the docker-compose cluster with --cluster, or
+against an in-process stand-in server otherwise. Reports throughput, p50/p95/p99
+latency and peak traced memory, and can save the results as JSON and compare
+them with a previous run.
+
+usage: python benchmark.py serializers --documents 100000
+       python benchmark.py interface --documents 10000 --concurrency 1 8 --output run.json
+       python benchmark.py interface --cluster --compare run.json
+"""
+#imports
+import argparse
+import copy
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from main import REMOVE_FIELD_SCRIPT, SET_FIELD_SCRIPT, ElasticsearchInterface, _deep_merge, orjson
+
+
+def make_documents(count):
+    """
+    Generate vehicle documents like the ones used in the practice queries.
+    """
+    makes = ["honda", "toyota", "ford", "bmw", "audi"]
+    for i in range(count):
+        yield {
+            "doc_number": i,
+            "make": makes[i % len(makes)],
+            "color": "blue" if i % 2 else "red",
+            "price": 10000 + (i * 37) % 40000 + 0.99,
+            "sold": f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "features": ["abs", "gps", "heated seats"][: i % 3 + 1],
+        }
+
+
+def build_bulk_bodies(es_interface, index_name, documents):
+    """
+    Encode documents into _bulk request bodies without sending them.
+
+    Returns:
+        (chunks, bytes): Number of request bodies and their total size.
+    """
+    chunks = 0
+    total_bytes = 0
+    actions = es_interface._iter_index_actions(index_name, documents, id_field=None)
+    for chunk in es_interface._iter_bulk_chunks(actions, 500, 10485760):
+        total_bytes += len(b"".join(payload for _, _, payload in chunk))
+        chunks += 1
+    return chunks, total_bytes
+
+
+def benchmark_serializers(document_count, repeat):
+    """
+    Time the bulk encode and response decode paths for each serializer.
+
+    Returns:
+        results (list): One result dict per serializer and input format.
+    """
+    serializers = ["json"] + (["orjson"] if orjson is not None else [])
+    json_lines = [json.dumps(document).encode("utf-8") for document in make_documents(document_count)]
+    bulk_response = json.dumps({
+        "took": 5,
+        "errors": False,
+        "items": [{"index": {"_index": "bench", "_id": str(i), "status": 201, "result": "created"}}
+                  for i in range(document_count)],
+    })
+
+    results = []
+    for name in serializers:
+        es_interface = ElasticsearchInterface(serializer=name)
+        for input_format in ("dict", "bytes"):
+            best_encode = float("inf")
+            for _ in range(repeat):
+                documents = make_documents(document_count) if input_format == "dict" else iter(json_lines)
+                start = time.perf_counter()
+                chunks, total_bytes = build_bulk_bodies(es_interface, "bench", documents)
+                best_encode = min(best_encode, time.perf_counter() - start)
+
+            best_decode = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                es_interface.serializer.loads(bulk_response)
+                best_decode = min(best_decode, time.perf_counter() - start)
+
+            results.append({
+                "serializer": name,
+                "input": input_format,
+                "documents": document_count,
+                "chunks": chunks,
+                "bytes": total_bytes,
+                "encode_docs_per_second": document_count / best_encode,
+                "decode_seconds": best_decode,
+            })
+    return results
+
+
+class FakeElasticsearch:
+    """
+    In-process stand-in for a single-node cluster, so the interface benchmarks run offline.
+
+    Documents are kept in memory. It answers the requests the benchmarked methods
+    send: document CRUD and partial updates, _bulk, _mget, _search with a point in
+    time, _count and _refresh. Queries support match_all, match, term, range and
+    bool. Partial doc updates are deep-merged and the interface's field set and
+    remove scripts are emulated; other painless scripts are acknowledged but not
+    executed. Timings against it measure the interface's own overhead plus a local
+    HTTP round trip, not the performance of a real cluster.
+
+    Parameters:
+        host (str): Interface to listen on. Default is 127.0.0.1.
+        port (int): Port to listen on. Default is a free port.
+    """
+    def __init__(self, host="127.0.0.1", port=0):
+        self.indices = {}
+        self.lock = threading.Lock()
+        self.seq_no = 0
+        handler = type("Handler", (_FakeRequestHandler,), {"cluster": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, method, path, params, body):
+        """
+        Route one request.
+
+        Returns:
+            (status, response): HTTP status and JSON-serializable response body.
+        """
+        parts = [part for part in path.split("/") if part]
+        if not parts:
+            return 200, {"version": {"number": "7.15.0", "build_flavor": "default"}, "tagline": "You Know, for Search"}
+        if parts[-1] == "_bulk":
+            return self._bulk(parts[0] if len(parts) > 1 else None, body)
+
+        body = json.loads(body) if body else {}
+        if parts[0] == "_search":
+            return 200, self._search(body["pit"]["id"], body, params)
+        if parts[0] == "_pit":
+            return 200, {"succeeded": True, "num_freed": 1}
+
+        index_name, endpoint = parts[0], parts[1] if len(parts) > 1 else None
+        with self.lock:
+            if endpoint is None:
+                if method == "PUT":
+                    self.indices[index_name] = {}
+                    return 200, {"acknowledged": True, "index": index_name}
+                if method == "DELETE" and self.indices.pop(index_name, None) is not None:
+                    return 200, {"acknowledged": True}
+            if index_name not in self.indices:
+                return 404, {"error": {"type": "index_not_found_exception"}, "status": 404}
+            documents = self.indices[index_name]
+
+            if endpoint == "_doc" and method in ("PUT", "POST"):
+                return 201, self._put(index_name, parts[2], body)
+            if endpoint == "_doc" and method == "GET":
+                stored = documents.get(parts[2])
+                if stored is None:
+                    return 404, {"_index": index_name, "_id": parts[2], "found": False}
+                return 200, dict(self._meta(index_name, parts[2]), found=True, _source=stored["_source"])
+            if endpoint == "_doc" and method == "DELETE":
+                if documents.pop(parts[2], None) is None:
+                    return 404, {"_index": index_name, "_id": parts[2], "result": "not_found"}
+                return 200, {"_index": index_name, "_id": parts[2], "result": "deleted"}
+            if endpoint == "_update":
+                return self._update(index_name, parts[2], body, params)
+            if endpoint == "_mget":
+                ids = body["ids"] if "ids" in body else [doc["_id"] for doc in body["docs"]]
+                return 200, {"docs": [
+                    dict(self._meta(index_name, doc_id), found=True, _source=documents[doc_id]["_source"])
+                    if doc_id in documents else {"_index": index_name, "_id": doc_id, "found": False}
+                    for doc_id in map(str, ids)
+                ]}
+            if endpoint == "_count":
+                query = body.get("query")
+                return 200, {"count": sum(_matches(doc["_source"], query) for doc in documents.values())}
+            if endpoint == "_pit":
+                return 200, {"id": index_name}
+            if endpoint == "_refresh":
+                return 200, {"_shards": {"total": 1, "successful": 1, "failed": 0}}
+        if endpoint == "_search":
+            return 200, self._search(index_name, body, params)
+        return 400, {"error": {"type": "illegal_argument_exception", "reason": f"unsupported {method} {path}"}}
+
+    def _put(self, index_name, doc_id, source):
+        created = doc_id not in self.indices[index_name]
+        self.seq_no += 1
+        version = 1 if created else self.indices[index_name][doc_id]["_version"] + 1
+        self.indices[index_name][doc_id] = {"_source": source, "_version": version, "_seq_no": self.seq_no}
+        return dict(self._meta(index_name, doc_id), result="created" if created else "updated")
+
+    def _meta(self, index_name, doc_id):
+        stored = self.indices[index_name][doc_id]
+        return {"_index": index_name, "_id": doc_id, "_version": stored["_version"], "_seq_no": stored["_seq_no"],
+                "_primary_term": 1}
+
+    def _update(self, index_name, doc_id, body, params):
+        stored = self.indices[index_name].get(doc_id)
+        if stored is None:
+            return 404, {"error": {"type": "document_missing_exception"}, "status": 404}
+        if "if_seq_no" in params and int(params["if_seq_no"]) != stored["_seq_no"]:
+            return 409, {"error": {"type": "version_conflict_engine_exception"}, "status": 409}
+        source = _deep_merge(copy.deepcopy(stored["_source"]), body.get("doc", {}))
+        if "script" in body:
+            _run_field_script(source, body["script"])
+        return 200, self._put(index_name, doc_id, source)
+
+    def _bulk(self, default_index, body):
+        lines = iter(line for line in body.split(b"\n") if line.strip())
+        items = []
+        with self.lock:
+            for line in lines:
+                (action, meta), = json.loads(line).items()
+                index_name = meta.get("_index", default_index)
+                doc_id = str(meta["_id"]) if "_id" in meta else f"auto-{self.seq_no + 1}"
+                documents = self.indices.setdefault(index_name, {})
+                if action == "delete":
+                    found = documents.pop(doc_id, None) is not None
+                    items.append({action: {"_index": index_name, "_id": doc_id, "status": 200 if found else 404,
+                                           "result": "deleted" if found else "not_found"}})
+                    continue
+                source = json.loads(next(lines))
+                if action == "update":
+                    status, result = self._update(index_name, doc_id, source, {})
+                else:
+                    status, result = (201, self._put(index_name, doc_id, source))
+                items.append({action: dict(result, status=status)})
+        errors = any("error" in next(iter(item.values())) for item in items)
+        return 200, {"took": 1, "errors": errors, "items": items}
+
+    def _search(self, index_name, body, params):
+        with self.lock:
+            if index_name not in self.indices:
+                return {"error": {"type": "index_not_found_exception"}, "status": 404}
+            documents = sorted(self.indices[index_name].items())
+        hits = [(doc_id, stored) for doc_id, stored in documents if _matches(stored["_source"], body.get("query"))]
+        start = body["search_after"][0] if "search_after" in body else int(params.get("from", body.get("from", 0)))
+        size = int(params.get("size", body.get("size", 10)))
+        page = [
+            {"_index": index_name, "_id": doc_id, "_score": 1.0, "_source": stored["_source"], "sort": [start + n + 1]}
+            for n, (doc_id, stored) in enumerate(hits[start:start + size])
+        ]
+        response = {"took": 1, "timed_out": False, "hits": {"total": {"value": len(hits), "relation": "eq"},
+                                                            "max_score": 1.0, "hits": page}}
+        if "pit" in body:
+            response["pit_id"] = body["pit"]["id"]
+        return response
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    cluster = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            status, response = self.cluster.handle(self.command, url.path, params, body)
+        except Exception as e:
+            status, response = 400, {"error": {"type": "parse_exception", "reason": repr(e)}, "status": 400}
+        raw = b"" if self.command == "HEAD" else json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.end_headers()
+        self.wfile.write(raw)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _respond
+
+
+def _run_field_script(source, script):
+    """
+    Apply SET_FIELD_SCRIPT or REMOVE_FIELD_SCRIPT to a document source in place.
+    """
+    if script.get("source") not in (SET_FIELD_SCRIPT, REMOVE_FIELD_SCRIPT):
+        return
+    *path, name = script["params"]["field"].split(".")
+    parent = source
+    for key in path:
+        if not isinstance(parent.get(key), dict):
+            if script["source"] == REMOVE_FIELD_SCRIPT:
+                return
+            parent[key] = {}
+        parent = parent[key]
+    if script["source"] == SET_FIELD_SCRIPT:
+        parent[name] = script["params"]["value"]
+    else:
+        parent.pop(name, None)
+
+
+def _matches(source, query):
+    """
+    Evaluate the subset of the query DSL used by the interface against a document.
+    """
+    if not query or "match_all" in query:
+        return True
+    if "match" in query or "term" in query:
+        (field, value), = (query.get("match") or query["term"]).items()
+        value = value.get("query", value.get("value")) if isinstance(value, dict) else value
+        actual = source.get(field)
+        return value in actual if isinstance(actual, list) else actual == value
+    if "range" in query:
+        (field, bounds), = query["range"].items()
+        value = source.get(field)
+        return value is not None and all(
+            check(value, bounds[name]) for name, check in (
+                ("gt", lambda a, b: a > b), ("gte", lambda a, b: a >= b),
+                ("lt", lambda a, b: a < b), ("lte", lambda a, b: a <= b),
+            ) if name in bounds
+        )
+    if "bool" in query:
+        clauses = query["bool"]
+        return (all(_matches(source, clause) for clause in _as_list(clauses.get("must")) + _as_list(clauses.get("filter")))
+                and not any(_matches(source, clause) for clause in _as_list(clauses.get("must_not")))
+                and (not clauses.get("should") or any(_matches(source, clause) for clause in _as_list(clauses["should"]))))
+    return True
+
+
+def _as_list(clauses):
+    return clauses if isinstance(clauses, list) else [clauses] if clauses else []
+
+
+def interface_operations(es_interface, index_name, document_count, mget_size=100):
+    """
+    Build the benchmarked operations. Each takes an operation number and performs one call.
+
+    Mutators are run in create, update, delete order on the same documents, so every
+    call changes something on a real cluster.
+
+    Returns:
+        operations (dict): Benchmark name to operation.
+    """
+    def doc_id(i):
+        return str(i % document_count)
+
+    return {
+        "index": lambda i: es_interface.create_document(index_name, f"new-{i}", {"doc_number": i, "make": "bench"}),
+        "get": lambda i: es_interface.get_document(index_name, doc_id(i)),
+        "mget": lambda i: list(es_interface.get_multiple_documents(
+            index_name, (doc_id(i * mget_size + n) for n in range(mget_size)))),
+        "search": lambda i: es_interface.search_documents_by_query(
+            index_name, {"query": {"term": {"doc_number": i % document_count}}}),
+        "count": lambda i: es_interface.count_documents_by_query(index_name, "make", "honda"),
+        "scan": lambda i: sum(1 for _ in es_interface.iter_all_documents(index_name)),
+        "create_field": lambda i: es_interface.create_field_in_document(index_name, doc_id(i), "bench", i),
+        "update_field": lambda i: es_interface.update_field_in_document(index_name, doc_id(i), "bench", -i),
+        "delete_field": lambda i: es_interface.delete_field_from_document(index_name, doc_id(i), "bench"),
+        "create_element": lambda i: es_interface.create_element_in_object_field(
+            index_name, doc_id(i), "features", "bench"),
+        "update_element": lambda i: es_interface.update_element_in_object_field(
+            index_name, doc_id(i), "features", "bench", "bench-updated"),
+        "delete_element": lambda i: es_interface.delete_element_from_object_field(
+            index_name, doc_id(i), "features", "bench-updated"),
+    }
+
+
+def load_dataset(es_interface, index_name, document_count):
+    """
+    Recreate the benchmark index and bulk load the generated documents into it.
+    """
+    es_interface.client.indices.delete(index=index_name, ignore=[404])
+    es_interface.create_index(index_name)
+    es_interface.bulk_index_documents(index_name, make_documents(document_count), id_field="doc_number")
+    es_interface.refresh_index(index_name)
+
+
+def percentile(sorted_values, q):
+    """
+    Linearly interpolated percentile of an already sorted list, for q between 0 and 100.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def run_operation(name, operation, operations, concurrency, trace_memory=True):
+    """
+    Call an operation the given number of times from a pool of threads.
+
+    A call that raises or returns None, which is how the interface reports a
+    failure, counts as an error.
+
+    Returns:
+        result (dict): Throughput, latency percentiles in milliseconds, error count
+            and peak traced memory in bytes (None without trace_memory).
+    """
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            ok = operation(i) is not None
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, range(operations)))
+    elapsed = time.perf_counter() - start
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        "benchmark": name,
+        "concurrency": concurrency,
+        "operations": operations,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "elapsed_seconds": elapsed,
+        "ops_per_second": operations / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def benchmark_interface(es_interface, document_count, operations, concurrency_levels, benchmarks=None,
+                        scans=3, trace_memory=True, index_name="benchmark_index"):
+    """
+    Load a dataset and run the interface benchmarks at each concurrency level.
+
+    Parameters:
+        es_interface (ElasticsearchInterface): Interface connected to the target.
+        document_count (int): Number of documents loaded before the run.
+        operations (int): Calls per benchmark and concurrency level.
+        concurrency_levels (list): Numbers of threads calling concurrently.
+        benchmarks (list): Names of the benchmarks to run. Default is all of them.
+        scans (int): Calls for the scan benchmark, which reads the whole index.
+        trace_memory (bool): Record peak memory with tracemalloc, which slows
+            every benchmark down by a similar factor.
+        index_name (str): Index to (re)create for the run.
+
+    Returns:
+        results (list): One result dict per benchmark and concurrency level.
+    """
+    load_dataset(es_interface, index_name, document_count)
+    all_operations = interface_operations(es_interface, index_name, document_count)
+    results = []
+    for concurrency in concurrency_levels:
+        for name, operation in all_operations.items():
+            if benchmarks and name not in benchmarks:
+                continue
+            count = scans if name == "scan" else operations
+            results.append(run_operation(name, operation, count, concurrency, trace_memory))
+    return results
+
+
+def compare_results(previous, results, threshold):
+    """
+    Compare results with those of a previous run of the same benchmarks.
+
+    A benchmark regresses when its throughput fell, or its p95 latency rose, by more
+    than threshold (a fraction).
+
+    Returns:
+        (rows, regressions): One comparison row per matching benchmark, and the rows
+        that regressed.
+    """
+    previous_results = {(result["benchmark"], result["concurrency"]): result for result in previous["results"]}
+    rows = []
+    for result in results:
+        before = previous_results.get((result["benchmark"], result["concurrency"]))
+        if before is None:
+            continue
+        row = {
+            "benchmark": result["benchmark"],
+            "concurrency": result["concurrency"],
+            "throughput_change": result["ops_per_second"] / before["ops_per_second"] - 1,
+            "p95_change": result["p95_ms"] / before["p95_ms"] - 1,
+        }
+        row["regressed"] = row["throughput_change"] < -threshold or row["p95_change"] > threshold
+        rows.append(row)
+    return rows, [row for row in rows if row["regressed"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the ElasticsearchInterface module")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    serializers_parser = subparsers.add_parser("serializers", help="compare JSON serializers on the bulk path")
+    serializers_parser.add_argument("--documents", type=int, default=100000)
+    serializers_parser.add_argument("--repeat", type=int, default=3)
+
+    interface_parser = subparsers.add_parser("interface", help="time interface methods against a cluster")
+    interface_parser.add_argument("--cluster", action="store_true",
+                                  help="run against host:port instead of an in-process stand-in server")
+    interface_parser.add_argument("--host", default="localhost")
+    interface_parser.add_argument("--port", type=int, default=9200)
+    interface_parser.add_argument("--documents", type=int, default=10000)
+    interface_parser.add_argument("--operations", type=int, default=1000)
+    interface_parser.add_argument("--scans", type=int, default=3)
+    interface_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    interface_parser.add_argument("--benchmarks", nargs="+", help="subset of benchmarks to run")
+    interface_parser.add_argument("--serializer", default=None)
+    interface_parser.add_argument("--no-memory", dest="trace_memory", action="store_false",
+                                  help="do not trace memory allocations")
+    interface_parser.add_argument("--output", help="write the results to this JSON file")
+    interface_parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    interface_parser.add_argument("--threshold", type=float, default=0.1,
+                                  help="relative change counted as a regression")
+
+    args = parser.parse_args()
+    if args.benchmark == "serializers":
+        for result in benchmark_serializers(args.documents, args.repeat):
+            print(f"{result['serializer']:>7} {result['input']:>5} input: "
+                  f"{result['encode_docs_per_second']:>12,.0f} docs/s encoded, "
+                  f"{result['decode_seconds'] * 1000:>8.1f} ms to decode the bulk response")
+
+    elif args.benchmark == "interface":
+        run = {
+            "started": datetime.now(timezone.utc).isoformat(),
+            "target": f"{args.host}:{args.port}" if args.cluster else "fake",
+            "python": platform.python_version(),
+            "documents": args.documents,
+            "operations": args.operations,
+            "serializer": args.serializer,
+            "trace_memory": args.trace_memory,
+        }
+        if args.cluster:
+            es_interface = ElasticsearchInterface(args.host, args.port, serializer=args.serializer)
+            results = benchmark_interface(es_interface, args.documents, args.operations, args.concurrency,
+                                          args.benchmarks, args.scans, args.trace_memory)
+        else:
+            with FakeElasticsearch() as cluster:
+                es_interface = ElasticsearchInterface(cluster.host, cluster.port, serializer=args.serializer,
+                                                      connections_per_node=max(args.concurrency))
+                results = benchmark_interface(es_interface, args.documents, args.operations, args.concurrency,
+                                              args.benchmarks, args.scans, args.trace_memory)
+        run["results"] = results
+
+        for result in results:
+            memory = result["peak_memory_bytes"]
+            print(f"{result['benchmark']:>14} x{result['concurrency']:<3} "
+                  f"{result['ops_per_second']:>10,.1f} ops/s  "
+                  f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+                  f"errors {result['errors']:>5}  "
+                  + (f"peak {memory / 1048576:>7.1f} MiB" if memory is not None else ""))
+
+        if args.output:
+            with open(args.output, "w") as output:
+                json.dump(run, output, indent=2)
+
+        if args.compare:
+            with open(args.compare) as previous:
+                rows, regressions = compare_results(json.load(previous), results, args.threshold)
+            for row in rows:
+                print(f"{row['benchmark']:>14} x{row['concurrency']:<3} "
+                      f"throughput {row['throughput_change']:>+7.1%}  p95 {row['p95_change']:>+7.1%}"
+                      + ("  REGRESSED" if row["regressed"] else ""))
+            if regressions:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
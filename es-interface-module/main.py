@@ -9,40 +9,3670 @@ reference: https://www.elastic.co/guide/en/elasticsearch/client/python-api/7.16/
 @author: ameeragangat
 """
 #imports
-from elasticsearch import Elasticsearch
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import copy
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import logging
+import mmap
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from elasticsearch import Elasticsearch, Urllib3HttpConnection
+from elasticsearch.connection_pool import ConnectionSelector, RandomSelector, RoundRobinSelector
+from elasticsearch.exceptions import SerializationError
+from elasticsearch.helpers import BulkIndexError
+from elasticsearch.serializer import JSONSerializer
+
+try:
+    from elasticsearch import AIOHttpConnection, AsyncElasticsearch
+except ImportError:  # requires the elasticsearch[async] extra
+    AIOHttpConnection = AsyncElasticsearch = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+class LeastLoadedSelector(ConnectionSelector):
+    """
+    Select the live connection with the most free sockets in its connection pool.
+
+    Ties, and connections that do not expose a urllib3 pool, are broken by a
+    round-robin shared across all threads.
+    """
+    def __init__(self, opts):
+        super().__init__(opts)
+        self._counter = itertools.count()
+
+    def select(self, connections):
+        offset = next(self._counter) % len(connections)
+        rotated = connections[offset:] + connections[:offset]
+        return max(rotated, key=self._free_slots)
+
+    @staticmethod
+    def _free_slots(connection):
+        # urllib3 keeps one queue entry per free socket slot, idle or not yet opened
+        slots = getattr(getattr(connection, "pool", None), "pool", None)
+        return slots.qsize() if slots is not None else 0
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    JSON serializer backed by orjson, which encodes and decodes several times
+    faster than the standard library. Types orjson does not know natively fall
+    back to JSONSerializer.default, and data orjson rejects but the standard
+    library accepts, such as integers beyond 64 bits, is encoded by JSONSerializer.
+    """
+    def dumps(self, data):
+        # don't serialize strings
+        if isinstance(data, (str, bytes)):
+            return data
+
+        try:
+            return orjson.dumps(data, default=self.default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().dumps(data)
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+
+def _resolve_serializer(serializer):
+    """
+    Pick the serializer for a client: orjson when installed unless 'json' is requested.
+    """
+    if serializer is None:
+        serializer = "orjson" if orjson is not None else "json"
+    if serializer == "json":
+        return JSONSerializer()
+    if serializer == "orjson":
+        if orjson is None:
+            raise ImportError("serializer='orjson' requires orjson")
+        return OrjsonSerializer()
+    if isinstance(serializer, str):
+        raise ValueError(f"Unknown serializer '{serializer}', expected 'json' or 'orjson'")
+    return serializer
+
+
+NODE_SELECTORS = {
+    "round_robin": RoundRobinSelector,
+    "random": RandomSelector,
+    "least_loaded": LeastLoadedSelector,
+}
+
+
+def _build_transport_options(host, port, hosts=None, sniff_on_start=False, sniff_on_connection_fail=False,
+                             sniffer_timeout=None, connections_per_node=10, http_keep_alive=True,
+                             http_compress=False, timeout=10, max_retries=3, retry_on_timeout=False,
+                             node_selector="round_robin", serializer=None):
+    """
+    Translate the interface's transport settings into Elasticsearch client arguments.
+
+    Returns:
+        (hosts, options): Host list and keyword arguments for the client constructor.
+    """
+    if node_selector not in NODE_SELECTORS:
+        raise ValueError(f"Unknown node selector '{node_selector}', expected one of {sorted(NODE_SELECTORS)}")
+
+    options = {
+        "sniff_on_start": sniff_on_start,
+        "sniff_on_connection_fail": sniff_on_connection_fail,
+        "sniffer_timeout": sniffer_timeout,
+        "maxsize": connections_per_node,
+        "http_compress": http_compress,
+        "timeout": timeout,
+        "max_retries": max_retries,
+        "retry_on_timeout": retry_on_timeout,
+        "selector_class": NODE_SELECTORS[node_selector],
+        "serializer": _resolve_serializer(serializer),
+    }
+    if not http_keep_alive:
+        options["headers"] = {"connection": "close"}
+    return hosts or [{'host': host, 'port': port}], options
+
+
+class Metrics:
+    """
+    In-process histograms and counters for calls made through the interfaces.
+
+    Every series is labelled with the interface method that was called and the
+    index it targeted. HTTP requests sent while a method runs, including those sent
+    from its worker threads, are attributed to that method; requests sent outside
+    any method are labelled method="other". Safe to share between threads and
+    between interfaces.
+
+    Recorded series:
+        es_interface_call_duration_seconds: Wall time of each method call. For
+            generator methods it covers the whole iteration.
+        es_interface_request_duration_seconds: Round trip time of each HTTP request.
+        es_interface_took_seconds: Time Elasticsearch reports having spent ("took").
+        es_interface_response_bytes: Size of each response body.
+        es_interface_requests_total: HTTP requests by status code.
+        es_interface_errors_total: Failed HTTP requests by exception class.
+        es_interface_retries_total: Requests repeated by the interface, by reason.
+
+    Parameters:
+        duration_buckets (tuple): Upper bounds in seconds of the duration histograms.
+        size_buckets (tuple): Upper bounds in bytes of the size histograms.
+    """
+    DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+    HELP = {
+        "es_interface_call_duration_seconds": "Wall time of interface method calls.",
+        "es_interface_request_duration_seconds": "Round trip time of HTTP requests to Elasticsearch.",
+        "es_interface_took_seconds": "Time Elasticsearch reported spending on requests.",
+        "es_interface_response_bytes": "Size of Elasticsearch response bodies.",
+        "es_interface_requests_total": "HTTP requests sent to Elasticsearch.",
+        "es_interface_errors_total": "HTTP requests to Elasticsearch that failed.",
+        "es_interface_retries_total": "Requests repeated by the interface.",
+    }
+
+    def __init__(self, duration_buckets=DURATION_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.duration_buckets = tuple(duration_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, value, **labels):
+        """
+        Add a value to a histogram. Names ending in _bytes use the size buckets.
+        """
+        buckets = self.size_buckets if name.endswith("_bytes") else self.duration_buckets
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = {"counts": [0] * (len(buckets) + 1), "sum": 0, "count": 0}
+            series["counts"][bisect.bisect_left(buckets, value)] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def increment(self, name, amount=1, **labels):
+        """
+        Add to a counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def stats(self):
+        """
+        Get a snapshot of every series.
+
+        Returns:
+            stats (dict): For each series name, a list of entries with their labels
+                and either a "value" (counters) or "count", "sum" and cumulative
+                "buckets" keyed by upper bound (histograms).
+        """
+        stats = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                stats.setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), series in self._histograms.items():
+                bounds = self._bounds(name)
+                stats.setdefault(name, []).append({
+                    "labels": dict(labels),
+                    "count": series["count"],
+                    "sum": series["sum"],
+                    "buckets": dict(zip(bounds, itertools.accumulate(series["counts"]))),
+                })
+        return stats
+
+    def reset(self):
+        """
+        Drop every recorded series.
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """
+        Render every series in the Prometheus text exposition format, for example to
+        serve from a /metrics endpoint or to push to a Pushgateway.
+
+        Returns:
+            text (str): The exposition, one sample per line.
+        """
+        lines = []
+        for name, entries in sorted(self.stats().items()):
+            kind = "histogram" if "buckets" in entries[0] else "counter"
+            lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for entry in sorted(entries, key=lambda entry: sorted(entry["labels"].items())):
+                labels = entry["labels"]
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {entry['value']}")
+                    continue
+                for bound, count in entry["buckets"].items():
+                    lines.append(f"{name}_bucket{_format_labels(dict(labels, le=bound))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {entry['sum']}")
+                lines.append(f"{name}_count{_format_labels(labels)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _bounds(self, name):
+        buckets = self.size_buckets if name.endswith("_bytes") else self.duration_buckets
+        return [repr(bound) for bound in buckets] + ["+Inf"]
+
+
+def _format_labels(labels):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class _Call:
+    """
+    An instrumented interface method call that HTTP requests are attributed to.
+    """
+    __slots__ = ("method", "index", "start", "span")
+
+    def __init__(self, method, index, span):
+        self.method = method
+        self.index = index
+        self.start = time.perf_counter()
+        self.span = span
+
+
+_current_call = contextvars.ContextVar("es_interface_call", default=None)
+
+_TOOK_PATTERN = re.compile(r'"took"\s*:\s*(\d+)')
+
+
+def _call_labels(url=None):
+    """
+    Get the method and index labels for the call in progress.
+    """
+    call = _current_call.get()
+    if call is not None:
+        return {"method": call.method, "index": call.index}
+    segment = url.split("/")[1] if url else ""
+    return {"method": "other", "index": "" if segment.startswith("_") else segment}
+
+
+def _instrumented(method):
+    """
+    Time an interface method and attribute the requests it sends to it.
+
+    Handles plain methods, generator methods and coroutines. Nothing is recorded
+    unless the interface has metrics, a tracer or a query profiler, and a method
+    called from inside another instrumented method is attributed to the outer call
+    only.
+    """
+    name = method.__name__
+
+    def begin(interface, args, kwargs):
+        if _current_call.get() is not None or (interface.metrics is None and interface.tracer is None
+                                               and getattr(interface, "query_profiler", None) is None):
+            return None
+        index_name = kwargs.get("index_name", args[0] if args else None)
+        index_name = index_name if isinstance(index_name, str) else ""
+        span = None
+        if interface.tracer is not None:
+            span = interface.tracer.start_span(f"elasticsearch.{name}", attributes={
+                "db.system": "elasticsearch",
+                "db.operation": name,
+                "db.elasticsearch.index": index_name,
+            })
+        return _Call(name, index_name, span)
+
+    def end(interface, call):
+        if interface.metrics is not None:
+            interface.metrics.observe("es_interface_call_duration_seconds", time.perf_counter() - call.start,
+                                      method=call.method, index=call.index)
+        if call.span is not None:
+            call.span.end()
+
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            call = begin(self, args, kwargs)
+            if call is None:
+                return (yield from method(self, *args, **kwargs))
+
+            # the call is only current while the generator runs, not while the caller
+            # consumes what it yielded
+            generator = method(self, *args, **kwargs)
+            try:
+                while True:
+                    token = _current_call.set(call)
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        _current_call.reset(token)
+                    yield item
+            finally:
+                token = _current_call.set(call)
+                try:
+                    generator.close()
+                finally:
+                    _current_call.reset(token)
+                    end(self, call)
+
+    elif inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            call = begin(self, args, kwargs)
+            if call is None:
+                return await method(self, *args, **kwargs)
+            token = _current_call.set(call)
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                _current_call.reset(token)
+                end(self, call)
+
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            call = begin(self, args, kwargs)
+            if call is None:
+                return method(self, *args, **kwargs)
+            token = _current_call.set(call)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                _current_call.reset(token)
+                end(self, call)
+
+    return wrapper
+
+
+def _record_request(metrics, url, start, status, raw_data=None, error=None):
+    """
+    Record one HTTP request against the call in progress.
+    """
+    labels = _call_labels(url)
+    metrics.observe("es_interface_request_duration_seconds", time.perf_counter() - start, **labels)
+    metrics.increment("es_interface_requests_total", status=str(status), **labels)
+    if error is not None:
+        metrics.increment("es_interface_errors_total", error=type(error).__name__, **labels)
+        call = _current_call.get()
+        if call is not None and call.span is not None:
+            call.span.set_attribute("error.type", type(error).__name__)
+    if raw_data is not None:
+        metrics.observe("es_interface_response_bytes", len(raw_data), **labels)
+        # "took" is the first key of the responses that carry it
+        took = _TOOK_PATTERN.search(raw_data, 0, 64) if isinstance(raw_data, str) else None
+        if took is not None:
+            metrics.observe("es_interface_took_seconds", int(took.group(1)) / 1000, **labels)
+
+
+class InstrumentedConnection(Urllib3HttpConnection):
+    """
+    HTTP connection that records every request into a Metrics instance.
+
+    Used by ElasticsearchInterface when it is created with metrics.
+    """
+    def __init__(self, metrics=None, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    def perform_request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            status, headers, raw_data = super().perform_request(method, url, *args, **kwargs)
+        except Exception as e:
+            _record_request(self.metrics, url, start, getattr(e, "status_code", "N/A"), error=e)
+            raise
+        _record_request(self.metrics, url, start, status, raw_data)
+        return status, headers, raw_data
+
+
+if AIOHttpConnection is not None:
+    class InstrumentedAIOHttpConnection(AIOHttpConnection):
+        """
+        Async HTTP connection that records every request into a Metrics instance.
+
+        Used by AsyncElasticsearchInterface when it is created with metrics.
+        """
+        def __init__(self, metrics=None, **kwargs):
+            super().__init__(**kwargs)
+            self.metrics = metrics
+
+        async def perform_request(self, method, url, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                status, headers, raw_data = await super().perform_request(method, url, *args, **kwargs)
+            except Exception as e:
+                _record_request(self.metrics, url, start, getattr(e, "status_code", "N/A"), error=e)
+                raise
+            _record_request(self.metrics, url, start, status, raw_data)
+            return status, headers, raw_data
+else:
+    InstrumentedAIOHttpConnection = None
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache bounded by entry count and total size.
+
+    Parameters:
+        max_entries (int): Maximum number of cached entries.
+        max_bytes (int): Maximum total estimated size of the cached values in bytes.
+        ttl (float): Seconds an entry stays valid. Default is no expiry.
+    """
+    def __init__(self, max_entries=10000, max_bytes=67108864, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, is_valid=None):
+        """
+        Look up a key, marking it as recently used.
+
+        An entry for which is_valid(value) returns False is dropped and counted as a miss.
+
+        Returns:
+            (found, value): Whether the key was cached and its value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            if is_valid is not None and not is_valid(value):
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value, size):
+        """
+        Store a value with its estimated size, evicting least recently used entries.
+
+        Values larger than max_bytes are not cached.
+        """
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            self._on_insert(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self):
+        """
+        Return hit, miss, eviction and expiration counters with the current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        self._on_remove(key)
+
+    def _on_insert(self, key):
+        pass
+
+    def _on_remove(self, key):
+        pass
+
+
+class DocumentCache(LRUCache):
+    """
+    Cache of document sources keyed by (index, id, source fields).
+
+    Entries are keyed by the index name as passed to the interface, so reads
+    through an alias are invalidated by writes through the same alias only.
+    Stored and returned sources are copies, so callers may mutate them freely.
+    """
+    def __init__(self, max_entries=10000, max_bytes=67108864, ttl=None):
+        super().__init__(max_entries, max_bytes, ttl)
+        self._keys_by_document = {}
+        self._invalidations = 0
+
+    def lookup(self, index_name, doc_id, fields=None):
+        """
+        Look up a cached document source.
+
+        Returns:
+            (found, source, token): The token must be passed to store after a miss so
+            that a fetch racing with a write does not cache a stale source.
+        """
+        found, source = self.get((index_name, str(doc_id), self._fields_key(fields)))
+        return found, copy.deepcopy(source) if found else None, self._invalidations
+
+    def store(self, index_name, doc_id, fields, source, token):
+        with self._lock:
+            if token != self._invalidations:
+                return
+            size = len(json.dumps(source, default=str))
+            self.put((index_name, str(doc_id), self._fields_key(fields)), copy.deepcopy(source), size)
+
+    def invalidate(self, index_name, doc_id=None):
+        """
+        Drop the cached sources of one document, or of a whole index when doc_id is None.
+        """
+        with self._lock:
+            self._invalidations += 1
+            if doc_id is None:
+                keys = [key for key in self._entries if key[0] == index_name]
+            else:
+                keys = list(self._keys_by_document.get((index_name, str(doc_id)), ()))
+            for key in keys:
+                self.pop(key)
+
+    @staticmethod
+    def _fields_key(fields):
+        return None if fields is None else tuple(fields)
+
+    def _on_insert(self, key):
+        self._keys_by_document.setdefault(key[:2], set()).add(key)
+
+    def _on_remove(self, key):
+        keys = self._keys_by_document.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_document[key[:2]]
+
+
+class SearchCache(LRUCache):
+    """
+    Cache of search responses keyed by index and a canonical hash of the request body.
+
+    Every index has a generation counter that is bumped by writes and refreshes made
+    through the interface. Entries remember the generations they were computed
+    against and are dropped as stale once any of them has moved on. Comma-separated
+    index lists are tracked per index; wildcards and aliases are tracked by the
+    name as passed to the interface.
+
+    A write is only searchable after the next refresh, so responses for an index
+    written since its last refresh_index are not stored until refresh_interval
+    seconds have passed. Otherwise a search right after a write would cache a
+    response without it for the rest of the generation.
+
+    Parameters:
+        refresh_interval (float): Seconds after a write until Elasticsearch has
+            refreshed the index on its own, as its index.refresh_interval setting.
+            None stores nothing for a written index until refresh_index is called.
+    """
+    def __init__(self, max_entries=10000, max_bytes=67108864, ttl=None, refresh_interval=1.0):
+        super().__init__(max_entries, max_bytes, ttl)
+        self.refresh_interval = refresh_interval
+        self._generations = {}
+        self._written_at = {}
+        self.stale = 0
+        self.unrefreshed = 0
+
+    def lookup(self, index_name, body):
+        """
+        Look up a cached response.
+
+        Returns:
+            (found, response, token): The token must be passed to store after a miss.
+        """
+        def is_current(entry):
+            if entry[0] == generation:
+                return True
+            self.stale += 1
+            return False
+
+        with self._lock:
+            generation = self._generation(index_name)
+            found, entry = self.get((index_name, _canonical_hash(body)), is_current)
+            return found, copy.deepcopy(entry[1]) if found else None, generation
+
+    def store(self, index_name, body, response, token):
+        with self._lock:
+            if self._unrefreshed(index_name):
+                self.unrefreshed += 1
+                return
+        size = len(json.dumps(response, default=str))
+        self.put((index_name, _canonical_hash(body)), (token, copy.deepcopy(response)), size)
+
+    def bump(self, index_name):
+        """
+        Start a new generation for an index that was written to, making its cached
+        responses stale.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for name in index_name.split(","):
+                self._generations[name] = self._generations.get(name, 0) + 1
+                self._written_at[name] = now
+
+    def refreshed(self, index_name, since=None):
+        """
+        Start a new generation for a refreshed index.
+
+        Parameters:
+            index_name (str): The refreshed index.
+            since (float): time.monotonic() when the refresh was requested. Writes made
+                before it are searchable now. None if the refresh may have failed.
+        """
+        with self._lock:
+            for name in index_name.split(","):
+                self._generations[name] = self._generations.get(name, 0) + 1
+                if since is not None and self._written_at.get(name, since) <= since:
+                    self._written_at.pop(name, None)
+
+    def stats(self):
+        stats = super().stats()
+        stats["stale"] = self.stale
+        stats["unrefreshed"] = self.unrefreshed
+        return stats
+
+    def _unrefreshed(self, index_name):
+        now = time.monotonic()
+        for name in index_name.split(","):
+            written_at = self._written_at.get(name)
+            if written_at is None:
+                continue
+            if self.refresh_interval is not None and written_at + self.refresh_interval <= now:
+                del self._written_at[name]
+                continue
+            return True
+        return False
+
+    def _generation(self, index_name):
+        return tuple(self._generations.get(name, 0) for name in index_name.split(","))
+
+
+def _canonical_json(body):
+    """
+    Serialize a request body independently of dict key order.
+    """
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _canonical_hash(body):
+    return hashlib.sha1(_canonical_json(body).encode("utf-8")).hexdigest()
+
+
+def _query_shape(body):
+    """
+    Replace every value in a request body with '?', keeping its structure and field
+    names, so searches that differ only in their values share a shape.
+    """
+    if isinstance(body, dict):
+        return {key: _query_shape(value) for key, value in body.items()}
+    if isinstance(body, list):
+        return [_query_shape(value) for value in body]
+    return "?"
+
+
+class QueryProfiler:
+    """
+    Sampling profiler and slow-query log for searches.
+
+    A sample_rate fraction of searches is sent with "profile": true, and the
+    per-shard query, rewrite, collector, aggregation and fetch times Elasticsearch
+    reports are summarized. The profile is removed from the response returned to the
+    caller. Every search slower than slow_threshold_ms, sampled or not, is logged
+    as a warning with its calling method, index, canonical body, query shape,
+    round-trip time and server-side took time, plus the profile summary if it was
+    sampled. The record is the JSON message of the log entry and is also attached
+    to it as the slow_query attribute.
+
+    Timings are also totalled per query shape, the body with its values stripped,
+    so top_shapes lists the most expensive kinds of searches.
+
+    Parameters:
+        sample_rate (float): Fraction of searches to profile, between 0 and 1.
+        slow_threshold_ms (float): Round-trip time above which a search is logged.
+        logger (logging.Logger): Where slow searches are logged. Default is the
+            'es_interface.slow_query' logger.
+        max_profiles (int): Number of recent profile summaries kept in profiles.
+    """
+    def __init__(self, sample_rate=0.01, slow_threshold_ms=500, logger=None, max_profiles=100):
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.logger = logger if logger is not None else logging.getLogger("es_interface.slow_query")
+        self.profiles = deque(maxlen=max_profiles)
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.sampled = 0
+        self.slow = 0
+
+    def search(self, client, index_name, body):
+        """
+        Run a search, profiling it if sampled and logging it if slow.
+
+        Returns:
+            response (dict): Elasticsearch response, without the profile.
+        """
+        sampled = random.random() < self.sample_rate
+        request = dict(body or {}, profile=True) if sampled else body
+        start = time.perf_counter()
+        response = client.search(index=index_name, body=request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        profile = self.summarize(response.pop("profile", None)) if sampled else None
+        shape = _canonical_json(_query_shape(body))
+        call = _current_call.get()
+        record = {
+            "method": call.method if call is not None else "other",
+            "index": index_name,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "took_ms": response.get("took"),
+            "shape": shape,
+        }
+        is_slow = elapsed_ms >= self.slow_threshold_ms
+        with self._lock:
+            self.searches += 1
+            self.sampled += sampled
+            self.slow += is_slow
+            if profile is not None:
+                self.profiles.append(dict(record, profile=profile))
+            totals = self._shapes.get(shape)
+            if totals is None:
+                totals = self._shapes[shape] = {"shape": shape, "count": 0, "slow": 0, "total_ms": 0.0, "max_ms": 0.0}
+            totals["count"] += 1
+            totals["slow"] += is_slow
+            totals["total_ms"] += elapsed_ms
+            totals["max_ms"] = max(totals["max_ms"], elapsed_ms)
+
+        if is_slow:
+            record["body"] = _canonical_json(body)
+            if profile is not None:
+                record["profile"] = profile
+            self.logger.warning(json.dumps(record), extra={"slow_query": record})
+        return response
+
+    @staticmethod
+    def summarize(profile):
+        """
+        Summarize the profile section of a search response per shard.
+
+        Parameters:
+            profile (dict): The "profile" value of a profiled search response.
+
+        Returns:
+            shards (list): Per-shard dicts with the shard id and query, rewrite,
+            collector, aggregation and fetch times in milliseconds, plus the slowest
+            top-level query, slowest first. fetch_ms is None on clusters that do
+            not profile the fetch phase.
+        """
+        def total_ms(nodes):
+            return sum(node.get("time_in_nanos", 0) for node in nodes) / 1e6
+
+        shards = []
+        for shard in (profile or {}).get("shards", []):
+            searches = shard.get("searches", [])
+            queries = [query for search in searches for query in search.get("query", [])]
+            slowest = max(queries, key=lambda query: query.get("time_in_nanos", 0), default=None)
+            fetch = shard.get("fetch")
+            summary = {
+                "shard": shard.get("id"),
+                "query_ms": total_ms(queries),
+                "rewrite_ms": sum(search.get("rewrite_time", 0) for search in searches) / 1e6,
+                "collector_ms": total_ms(collector for search in searches for collector in search.get("collector", [])),
+                "aggregation_ms": total_ms(shard.get("aggregations", [])),
+                "fetch_ms": fetch.get("time_in_nanos", 0) / 1e6 if fetch else None,
+                "slowest_query": None if slowest is None else {
+                    "type": slowest.get("type"),
+                    "description": slowest.get("description"),
+                    "time_ms": slowest.get("time_in_nanos", 0) / 1e6,
+                },
+            }
+            summary["total_ms"] = sum(summary[key] or 0 for key in
+                                      ("query_ms", "rewrite_ms", "collector_ms", "aggregation_ms", "fetch_ms"))
+            shards.append(summary)
+        return sorted(shards, key=lambda shard: shard["total_ms"], reverse=True)
+
+    def top_shapes(self, n=10):
+        """
+        Get the query shapes that took the most time in total.
+
+        Returns:
+            shapes (list): Dicts with the shape, its search count, slow search count
+            and total and maximum round-trip times in milliseconds.
+        """
+        with self._lock:
+            shapes = [dict(totals) for totals in self._shapes.values()]
+        return sorted(shapes, key=lambda totals: totals["total_ms"], reverse=True)[:n]
+
+    def stats(self):
+        with self._lock:
+            return {"searches": self.searches, "sampled": self.sampled, "slow": self.slow,
+                    "shapes": len(self._shapes)}
+
+    def reset(self):
+        with self._lock:
+            self.profiles.clear()
+            self._shapes.clear()
+            self.searches = self.sampled = self.slow = 0
+
+
+def _index_body(mappings=None, settings=None, aliases=None):
+    """
+    Build the body shared by index creation and index templates, leaving out unset parts.
+    """
+    body = {"mappings": mappings, "settings": settings, "aliases": aliases}
+    return {key: value for key, value in body.items() if value is not None}
+
+
+# Index settings Elasticsearch sets itself or that tie an index to its shards'
+# current state. Creating an index with any of them fails or misbehaves.
+_UNCOPYABLE_INDEX_SETTINGS = ("uuid", "creation_date", "creation_date_string", "provided_name", "version",
+                              "routing", "resize", "history", "verified_before_close", "blocks")
+
+
+def _copyable_index_settings(settings):
+    """
+    Get the "index" section of an index's settings, as returned by get_settings or
+    indices.get, without the keys a new index cannot be created with.
+    """
+    index_settings = settings.get("index", {})
+    return {key: value for key, value in index_settings.items() if key not in _UNCOPYABLE_INDEX_SETTINGS}
+
+
+def build_field_value_query(field_name, field_value):
+    """
+    Build the search body used by get_documents_by_field_value.
+    """
+    return {"query": {"match": {field_name: field_value}}}
+
+
+def build_field_range_query(field_name, start_range, end_range):
+    """
+    Build the search body used by get_documents_in_field_range.
+    """
+    return {"query": {"range": {field_name: {"gte": start_range, "lte": end_range}}}}
+
+
+def build_boolean_query(must_queries=None, must_not_queries=None, should_queries=None):
+    """
+    Build the search body used by combine_queries_with_boolean_logic.
+    """
+    combined_query = {"bool": {}}
+
+    if must_queries:
+        combined_query["bool"]["must"] = must_queries
+    if must_not_queries:
+        combined_query["bool"]["must_not"] = must_not_queries
+    if should_queries:
+        combined_query["bool"]["should"] = should_queries
+
+    return {"query": combined_query}
+
+
+# Painless scripts used by the field mutators. Field paths and values are passed as
+# params so every script is compiled once and then reused from the script cache.
+# Dotted field names address nested objects, e.g. "field_2.author".
+SET_FIELD_SCRIPT = (
+    "def path = params.field.splitOnToken('.'); def parent = ctx._source; "
+    "for (int i = 0; i < path.length - 1; i++) { "
+    "if (!(parent[path[i]] instanceof Map)) { parent[path[i]] = new HashMap(); } "
+    "parent = parent[path[i]]; } "
+    "parent[path[path.length - 1]] = params.value;"
+)
+REMOVE_FIELD_SCRIPT = (
+    "def path = params.field.splitOnToken('.'); def parent = ctx._source; "
+    "for (int i = 0; i < path.length - 1 && parent != null; i++) { "
+    "parent = parent[path[i]] instanceof Map ? parent[path[i]] : null; } "
+    "if (parent == null || !parent.containsKey(path[path.length - 1])) { ctx.op = 'noop'; } "
+    "else { parent.remove(path[path.length - 1]); }"
+)
+
+# Element scripts resolve params.field to a list and find params.element in it.
+# A missing list or element turns the update into a noop.
+_RESOLVE_LIST = (
+    "def path = params.field.splitOnToken('.'); def list = ctx._source; "
+    "for (int i = 0; i < path.length && list != null; i++) { "
+    "list = list instanceof Map ? list[path[i]] : null; } "
+    "int index = list instanceof List ? list.indexOf(params.element) : -1; "
+)
+REMOVE_ELEMENT_SCRIPT = _RESOLVE_LIST + "if (index < 0) { ctx.op = 'noop'; } else { list.remove(index); }"
+REPLACE_ELEMENT_SCRIPT = _RESOLVE_LIST + "if (index < 0) { ctx.op = 'noop'; } else { list.set(index, params.new_element); }"
+
+
+def _script(source, **params):
+    """
+    Build an inline painless script with params.
+    """
+    return {"source": source, "lang": "painless", "params": params}
+
+
+class TaskHandle:
+    """
+    A handle on a by-query or reindex task running in the background on the cluster.
+
+    Parameters:
+        interface (ElasticsearchInterface): The interface that submitted the task.
+        task_id (str): The task ID returned by Elasticsearch.
+        action (str): 'update_by_query', 'delete_by_query' or 'reindex'.
+        index_name (str): The index written to by the task.
+    """
+    def __init__(self, interface, task_id, action, index_name):
+        self.interface = interface
+        self.task_id = task_id
+        self.action = action
+        self.index_name = index_name
+
+    def status(self):
+        """
+        Get the raw task status.
+
+        Returns:
+            response (dict): Elasticsearch tasks API response.
+        """
+        try:
+            response = self.interface.client.tasks.get(task_id=self.task_id)
+            if response.get("completed"):
+                self.interface._invalidate(self.index_name)
+            return response
+        except Exception as e:
+            print(f"An error occurred while getting task status: {e}")
+            return None
+
+    def progress(self):
+        """
+        Summarize how far the task has got.
+
+        Returns:
+            progress (dict): Completed flag, document counters and the fraction done.
+        """
+        response = self.status()
+        if response is None:
+            return None
+        return self._summarize(response)
+
+    @staticmethod
+    def _summarize(response):
+        status = response["task"]["status"]
+        done = status.get("updated", 0) + status.get("created", 0) + status.get("deleted", 0) + status.get("noops", 0)
+        total = status.get("total", 0)
+        return {
+            "completed": response.get("completed", False),
+            "total": total,
+            "done": done,
+            "fraction": done / total if total else float(response.get("completed", False)),
+            "version_conflicts": status.get("version_conflicts", 0),
+            "requests_per_second": status.get("requests_per_second"),
+            "failures": response.get("response", {}).get("failures", []),
+        }
+
+    def wait(self, poll_interval=1.0, timeout=None, on_progress=None):
+        """
+        Poll the task until it completes.
+
+        Parameters:
+            poll_interval (float): Seconds between polls.
+            timeout (float): Seconds to wait before giving up. Default is no limit.
+            on_progress (callable): Optional callback given the progress summary after
+                every poll.
+
+        Returns:
+            response (dict): The task's final response, or None on timeout or error.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            response = self.status()
+            if response is None:
+                return None
+            if on_progress is not None:
+                on_progress(self._summarize(response))
+            if response.get("completed"):
+                return response.get("response")
+            if deadline is not None and time.monotonic() >= deadline:
+                print(f"Timed out waiting for task {self.task_id}.")
+                return None
+            time.sleep(poll_interval)
+
+    def rethrottle(self, requests_per_second):
+        """
+        Change the throttle of the running task.
+
+        Parameters:
+            requests_per_second (float): New throttle, or -1 to disable throttling.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            rethrottle = getattr(self.interface.client, f"{self.action}_rethrottle")
+            return rethrottle(task_id=self.task_id, requests_per_second=requests_per_second)
+        except Exception as e:
+            print(f"An error occurred while rethrottling task: {e}")
+            return None
+
+    def cancel(self, wait_for_completion=False):
+        """
+        Cancel the running task. Changes already made are kept.
+
+        Parameters:
+            wait_for_completion (bool): Return only once the task has stopped.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            return self.interface.client.tasks.cancel(task_id=self.task_id, wait_for_completion=wait_for_completion)
+        except Exception as e:
+            print(f"An error occurred while cancelling task: {e}")
+            return None
+        finally:
+            self.interface._invalidate(self.index_name)
+
+
+class _CoalescedRefresh:
+    """
+    Share refresh requests for one index between concurrent callers.
+
+    A caller joins the next refresh that has not been sent yet. The first caller to
+    join one leads it: it waits for the refresh in flight to complete and for the
+    coalesce window to pass, letting more callers join, then sends the single
+    request on behalf of all of them. Every refresh a caller waits for is sent after
+    the caller arrived, so it covers all writes acknowledged before that.
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.open = 0
+        self.leading = False
+        self.completed = -1
+        self.outcome = (None, None)
+
+    def run(self, send, window=0.0):
+        with self.condition:
+            generation = self.open
+            if self.leading:
+                while self.completed < generation:
+                    self.condition.wait()
+                return self._result()
+
+            self.leading = True
+            deadline = time.monotonic() + window
+            while True:
+                remaining = deadline - time.monotonic()
+                if self.completed >= generation - 1 and remaining <= 0:
+                    break
+                self.condition.wait(remaining if remaining > 0 else None)
+            self.open += 1
+            self.leading = False
+
+        response, error = None, None
+        try:
+            response = send()
+        except Exception as e:
+            error = e
+        with self.condition:
+            self.completed = generation
+            self.outcome = (response, error)
+            self.condition.notify_all()
+            return self._result()
+
+    def _result(self):
+        response, error = self.outcome
+        if error is not None:
+            raise error
+        return response
+
+
+class WriteBehindBuffer:
+    """
+    Coalesce partial document updates and send them together as _bulk update actions.
+
+    Updates to the same document that arrive within the flush window are deep-merged
+    into a single partial document, so a hot document costs one update action per
+    window instead of one request per call. Pending updates are flushed by a
+    background thread once the oldest has waited flush_interval seconds, or as soon
+    as max_pending documents have updates waiting.
+
+    Every update returns a Future that resolves to None once Elasticsearch has
+    acknowledged the merged update, or raises BulkIndexError if it failed. Reads do
+    not see pending updates, and other writes to the same document are not ordered
+    with them; call flush first where that matters. Call close before exiting, or
+    pending updates are lost.
+
+    Passed to ElasticsearchInterface as write_behind, the buffer takes over
+    update_document, create_field_in_document and update_field_in_document calls
+    that do not carry if_seq_no, if_primary_term or refresh. Field calls with an
+    object value are not buffered, because they replace the existing object while
+    a buffered update would merge into it.
+
+    Parameters:
+        flush_interval (float): Maximum seconds an update waits before it is sent.
+        max_pending (int): Number of documents with pending updates that triggers
+            an early flush.
+        retry_on_conflict (int): Times Elasticsearch retries an update that hit a
+            version conflict with another writer.
+        chunk_size (int): Maximum number of update actions per _bulk request.
+        max_chunk_bytes (int): Maximum size in bytes of a _bulk request body.
+        max_retries (int): How many times updates rejected with 429 are retried.
+        refresh: True or "wait_for" to make each flushed batch searchable before its
+            futures resolve.
+    """
+    def __init__(self, flush_interval=1.0, max_pending=1000, retry_on_conflict=3, chunk_size=500,
+                 max_chunk_bytes=10485760, max_retries=3, refresh=None):
+        self.interface = None
+        self.refresh = refresh
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_on_conflict = retry_on_conflict
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_retries = max_retries
+        self._pending = OrderedDict()
+        self._first_pending_at = None
+        self._condition = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._updates = 0
+        self._documents = 0
+        self._requests = 0
+        self._errors = 0
+
+    def update(self, index_name, doc_id, partial_document):
+        """
+        Queue a partial update of a document.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            partial_document (dict): Fields to set. Objects are merged into the existing
+                objects, any other value replaces the existing one.
+
+        Returns:
+            future (concurrent.futures.Future): Resolves once the update is acknowledged.
+        """
+        future = Future()
+        partial_document = copy.deepcopy(partial_document)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The write-behind buffer is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="es-write-behind", daemon=True)
+                self._thread.start()
+
+            key = (index_name, str(doc_id))
+            if key in self._pending:
+                document, futures = self._pending[key]
+                _deep_merge(document, partial_document)
+                futures.append(future)
+            else:
+                if not self._pending:
+                    self._first_pending_at = time.monotonic()
+                    # wake the worker to start timing flush_interval for the new batch
+                    self._condition.notify()
+                self._pending[key] = (partial_document, [future])
+            self._updates += 1
+            if len(self._pending) >= self.max_pending:
+                self._condition.notify()
+        return future
+
+    def set_field(self, index_name, doc_id, field_name, value):
+        """
+        Queue setting one field of a document. Dots in field_name address nested objects.
+        Like any partial update, an object value is merged into an existing object
+        rather than replacing it.
+
+        Returns:
+            future (concurrent.futures.Future): Resolves once the update is acknowledged.
+        """
+        partial_document = value
+        for name in reversed(field_name.split(".")):
+            partial_document = {name: partial_document}
+        return self.update(index_name, doc_id, partial_document)
+
+    def flush(self):
+        """
+        Send every pending update now and wait for Elasticsearch to acknowledge them.
+
+        Returns:
+            summary (dict): Number of documents updated, item errors and retries.
+        """
+        with self._send_lock:
+            with self._condition:
+                pending, self._pending = self._pending, OrderedDict()
+            summary = {"updated": 0, "errors": [], "retries": 0}
+            if not pending:
+                return summary
+
+            interface = self.interface
+            try:
+                actions = (
+                    (index_name, doc_id, interface._encode(
+                        {"update": {"_index": index_name, "_id": doc_id, "retry_on_conflict": self.retry_on_conflict}}
+                    ) + b"\n" + interface._encode({"doc": document}) + b"\n")
+                    for (index_name, doc_id), (document, _) in pending.items()
+                )
+                chunks = interface._iter_bulk_chunks(actions, self.chunk_size, self.max_chunk_bytes)
+                for chunk, last in _mark_last(chunks):
+                    updated, errors, retries = interface._send_bulk_chunk(chunk, max_retries=self.max_retries,
+                                                                          refresh=self.refresh if last else None)
+                    summary["updated"] += updated
+                    summary["errors"].extend(errors)
+                    summary["retries"] += retries
+                    self._requests += 1 + retries
+                    self._documents += len(chunk)
+
+                    failed = {(error["_index"], str(error["_id"])): error for error in errors}
+                    for index_name, doc_id, _ in chunk:
+                        error = failed.get((index_name, doc_id))
+                        for future in pending.pop((index_name, doc_id))[1]:
+                            if error is None:
+                                future.set_result(None)
+                            else:
+                                future.set_exception(BulkIndexError(f"Failed to update document '{doc_id}'", [error]))
+            except Exception as e:
+                print(f"An error occurred while flushing buffered updates: {e}")
+                for _, futures in pending.values():
+                    for future in futures:
+                        future.set_exception(e)
+            self._errors += len(summary["errors"]) + len(pending)
+            return summary
+
+    def close(self):
+        """
+        Flush every pending update and stop the background thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        """
+        Get counters showing how much the buffer coalesced.
+
+        Returns:
+            stats (dict): Updates queued, documents and _bulk requests sent, failed
+                documents, and pending documents.
+        """
+        with self._condition:
+            return {
+                "updates": self._updates,
+                "documents": self._documents,
+                "requests": self._requests,
+                "errors": self._errors,
+                "pending": len(self._pending),
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                while not self._closed and len(self._pending) < self.max_pending:
+                    remaining = self._first_pending_at + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            self.flush()
+
+
+def _mark_last(iterable):
+    """
+    Yield (item, is_last) pairs, looking one item ahead.
+    """
+    iterator = iter(iterable)
+    try:
+        previous = next(iterator)
+    except StopIteration:
+        return
+    for item in iterator:
+        yield previous, False
+        previous = item
+    yield previous, True
+
+
+def _deep_merge(target, source):
+    """
+    Merge source into target in place the way a partial doc update does: objects are
+    merged key by key, any other value replaces the existing one.
+    """
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+class AggregationBuilder:
+    """
+    Build the "aggs" section of a search body.
+
+    Bucket aggregations return the builder for their sub-aggregations, metric
+    aggregations return the builder they were added to so they can be chained.
+    The popular_cars practice query, for example, becomes:
+
+        aggs = AggregationBuilder()
+        aggs.terms("popular_cars", "make.keyword").avg("avg_price", "price").max("max_price", "price")
+        response = es_interface.aggregate("vehicles", aggs)
+    """
+    def __init__(self):
+        self._aggregations = {}
+
+    def add(self, name, aggregation_type, body):
+        """
+        Add any aggregation by type and body.
+
+        Returns:
+            builder (AggregationBuilder): Builder for the aggregation's sub-aggregations.
+        """
+        sub_aggregations = AggregationBuilder()
+        self._aggregations[name] = (aggregation_type, body, sub_aggregations)
+        return sub_aggregations
+
+    def terms(self, name, field, size=None, **options):
+        if size is not None:
+            options["size"] = size
+        return self.add(name, "terms", dict(options, field=field))
+
+    def histogram(self, name, field, interval, **options):
+        return self.add(name, "histogram", dict(options, field=field, interval=interval))
+
+    def date_histogram(self, name, field, calendar_interval=None, fixed_interval=None, **options):
+        if calendar_interval is not None:
+            options["calendar_interval"] = calendar_interval
+        if fixed_interval is not None:
+            options["fixed_interval"] = fixed_interval
+        return self.add(name, "date_histogram", dict(options, field=field))
+
+    def nested(self, name, path):
+        return self.add(name, "nested", {"path": path})
+
+    def metric(self, name, aggregation_type, field, **options):
+        """
+        Add a metric aggregation such as avg, min, max, sum, stats or cardinality.
+
+        Returns:
+            builder (AggregationBuilder): This builder, for chaining.
+        """
+        self.add(name, aggregation_type, dict(options, field=field))
+        return self
+
+    def stats(self, name, field, **options):
+        return self.metric(name, "stats", field, **options)
+
+    def avg(self, name, field, **options):
+        return self.metric(name, "avg", field, **options)
+
+    def min(self, name, field, **options):
+        return self.metric(name, "min", field, **options)
+
+    def max(self, name, field, **options):
+        return self.metric(name, "max", field, **options)
+
+    def sum(self, name, field, **options):
+        return self.metric(name, "sum", field, **options)
+
+    def cardinality(self, name, field, **options):
+        return self.metric(name, "cardinality", field, **options)
+
+    def to_dict(self):
+        """
+        Return the aggregations as an "aggs" dict.
+        """
+        aggregations = {}
+        for name, (aggregation_type, body, sub_aggregations) in self._aggregations.items():
+            aggregations[name] = {aggregation_type: body}
+            if sub_aggregations._aggregations:
+                aggregations[name]["aggs"] = sub_aggregations.to_dict()
+        return aggregations
+
+
+# NumPy dtypes for the columns of Elasticsearch field types. Other types become
+# object columns in NumPy, while Arrow infers their type from the values.
+COLUMN_DTYPES = {
+    "long": "int64",
+    "integer": "int32",
+    "short": "int16",
+    "byte": "int8",
+    "unsigned_long": "uint64",
+    "double": "float64",
+    "scaled_float": "float64",
+    "float": "float32",
+    "half_float": "float32",
+    "boolean": "bool",
+    "date": "datetime64[ms]",
+}
+
+# Field types whose values are always strings, made string columns in Arrow even
+# when a batch holds no value to infer that from.
+STRING_FIELD_TYPES = ("keyword", "constant_keyword", "wildcard", "text", "match_only_text", "search_as_you_type",
+                      "ip", "version", "binary")
+
+
+def _build_columns(columns, field_types, output):
+    """
+    Convert per-field value lists into the requested columnar format.
+
+    Parameters:
+        columns (dict): Field name to list of values, None where a hit had no value.
+        field_types (dict): Field name to Elasticsearch field type.
+        output (str): 'numpy', 'arrow' or 'dict'.
+    """
+    if output == "dict":
+        return columns
+    if output == "numpy":
+        if np is None:
+            raise ImportError("output='numpy' requires numpy")
+        return {name: _numpy_column(values, field_types.get(name)) for name, values in columns.items()}
+    if output == "arrow":
+        if pa is None:
+            raise ImportError("output='arrow' requires pyarrow")
+        arrays = [_arrow_column(values, field_types.get(name)) for name, values in columns.items()]
+        return pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    raise ValueError(f"Unknown output '{output}', expected 'numpy', 'arrow' or 'dict'")
+
+
+def _numpy_column(values, field_type):
+    dtype = COLUMN_DTYPES.get(field_type, object)
+    if dtype is not object and None in values:
+        # NumPy has no missing value for integers and booleans
+        if dtype == "bool":
+            dtype = object
+        elif dtype.startswith(("int", "uint")):
+            dtype = "float64"
+    return np.array(values, dtype=dtype)
+
+
+def _arrow_column(values, field_type):
+    arrow_type = _arrow_type(field_type)
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if arrow_type is not None:
+            raise
+        # values of mixed types, e.g. geo_points given both as strings and objects
+        return pa.array([value if value is None or isinstance(value, str) else json.dumps(value)
+                         for value in values], type=pa.string())
+
+
+def _arrow_type(field_type):
+    """
+    Get the Arrow type of a column, or None to infer it from the values.
+    """
+    # built from the dtype names directly, so Arrow output does not need numpy
+    if field_type in STRING_FIELD_TYPES:
+        return pa.string()
+    dtype = COLUMN_DTYPES.get(field_type)
+    if dtype is None:
+        return None
+    if dtype == "bool":
+        return pa.bool_()
+    if dtype == "datetime64[ms]":
+        return pa.timestamp("ms")
+    return getattr(pa, dtype)()
+
+
+class ElasticsearchInterface:
+    """
+    A class that provides an interface to interact with Elasticsearch.
+
+    Parameters:
+        host (str): The Elasticsearch host. Default is 'localhost'.
+        port (int): The Elasticsearch port. Default is 9200.
+        hosts (list): Seed nodes as 'host:port' strings or dicts. Overrides host and port.
+        sniff_on_start (bool): Discover the remaining cluster nodes on startup.
+        sniff_on_connection_fail (bool): Re-discover nodes when a connection fails.
+        sniffer_timeout (float): Seconds between periodic node discovery. Default is off.
+        connections_per_node (int): Size of the HTTP connection pool kept per node.
+        http_keep_alive (bool): Reuse HTTP connections between requests.
+        http_compress (bool): Gzip-compress request bodies.
+        timeout (float): Request timeout in seconds.
+        max_retries (int): Retries on connection errors and 502/503/504 responses.
+        retry_on_timeout (bool): Also retry requests that timed out.
+        node_selector (str): How a node is chosen per request: 'round_robin',
+            'random' or 'least_loaded'.
+        serializer: 'json', 'orjson' or an elasticsearch Serializer instance. Default
+            is orjson when it is installed.
+        document_cache (DocumentCache): Optional read-through cache used by
+            get_document, get_full_document_by_id and get_partial_document.
+        search_cache (SearchCache): Optional cache used by search_document,
+            search_documents_by_query, get_documents_by_field_value,
+            get_documents_in_field_range and combine_queries_with_boolean_logic.
+        metrics (Metrics): Optional recorder for per-method and per-index call and
+            request timings, response sizes, errors and retries.
+        tracer: Optional OpenTelemetry tracer. Every method call is recorded as a span.
+        write_behind (WriteBehindBuffer): Optional buffer that coalesces the partial
+            updates of update_document, create_field_in_document and
+            update_field_in_document. Those methods then return a Future, unless
+            called with if_seq_no, if_primary_term, refresh or an object field value,
+            which are sent directly.
+        refresh_coalesce_window (float): Seconds refresh_index waits for other callers
+            to share its refresh request. Concurrent callers share requests even
+            without a window.
+        query_profiler (QueryProfiler): Optional sampling profiler and slow-query log
+            for the searches of the methods search_cache applies to.
+    """
+    def __init__(self, host='localhost', port=9200, hosts=None, sniff_on_start=False, sniff_on_connection_fail=False,
+                 sniffer_timeout=None, connections_per_node=10, http_keep_alive=True, http_compress=False,
+                 timeout=10, max_retries=3, retry_on_timeout=False, node_selector="round_robin",
+                 serializer=None, document_cache=None, search_cache=None, metrics=None, tracer=None,
+                 write_behind=None, refresh_coalesce_window=0.0, query_profiler=None):
+        self.host = host
+        self.port = port
+        self.refresh_coalesce_window = refresh_coalesce_window
+        self._refreshes = {}
+        self._refreshes_lock = threading.Lock()
+        self.document_cache = document_cache
+        self.search_cache = search_cache
+        self.query_profiler = query_profiler
+        self.write_behind = write_behind
+        if write_behind is not None:
+            write_behind.interface = self
+        self.metrics = metrics
+        self.tracer = tracer
+        client_hosts, options = _build_transport_options(
+            host, port, hosts, sniff_on_start, sniff_on_connection_fail, sniffer_timeout, connections_per_node,
+            http_keep_alive, http_compress, timeout, max_retries, retry_on_timeout, node_selector, serializer)
+        self.serializer = options["serializer"]
+        if metrics is not None:
+            options.update(connection_class=InstrumentedConnection, metrics=metrics)
+        self.client = Elasticsearch(client_hosts, **options)
+
+
+    @_instrumented
+    def create_index(self, index_name, mappings=None, settings=None, aliases=None):
+        """
+        Create an Elasticsearch index.
+
+        Explicit mappings keep Elasticsearch from guessing a mapping for every new
+        field it sees. Setting "dynamic": "strict" in them rejects unknown fields,
+        which stops the mapping from growing with the data.
+
+        Parameters:
+            index_name (str): The name of the index to create.
+            mappings (dict): Optional mappings, e.g. {"properties": {"make": {"type": "keyword"}}}.
+            settings (dict): Optional index settings, e.g. {"number_of_shards": 3}.
+            aliases (dict): Optional aliases to create with the index.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            body = _index_body(mappings, settings, aliases)
+            response = self.client.indices.create(index=index_name, body=body or None)
+            return response
+        except Exception as e:
+            print(f"An error occurred while creating index: {e}")
+            return None
+
+    @_instrumented
+    def put_index_template(self, template_name, index_patterns, mappings=None, settings=None, aliases=None,
+                           priority=None):
+        """
+        Create or replace an index template, applied to every new index whose name
+        matches one of its patterns.
+
+        Parameters:
+            template_name (str): The name of the template.
+            index_patterns (list): Wildcard patterns of the index names to apply it to.
+            mappings (dict): Optional mappings for matching indices.
+            settings (dict): Optional index settings for matching indices.
+            aliases (dict): Optional aliases for matching indices.
+            priority (int): Optional priority. When several templates match, the one
+                with the highest priority is applied.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            body = {"index_patterns": index_patterns, "template": _index_body(mappings, settings, aliases)}
+            if priority is not None:
+                body["priority"] = priority
+            response = self.client.indices.put_index_template(name=template_name, body=body)
+            return response
+        except Exception as e:
+            print(f"An error occurred while putting index template: {e}")
+            return None
+
+    @contextlib.contextmanager
+    @_instrumented
+    def bulk_load_mode(self, index_name, refresh_interval="-1", number_of_replicas=0, force_merge=False,
+                       max_num_segments=1):
+        """
+        Tune an index for a large load for the duration of a with block.
+
+        Turning refresh off and dropping replicas means Elasticsearch neither builds
+        a new segment every second nor indexes each document once per replica while
+        loading. The previous refresh interval and replica count are restored when the
+        block exits, even if it raised, and the index is refreshed. Replicas then
+        recover by copying the finished segments.
+
+        Parameters:
+            index_name (str): The name of the index.
+            refresh_interval (str): Refresh interval while loading. "-1" disables refresh.
+            number_of_replicas (int): Replica count while loading.
+            force_merge (bool): Force-merge the index down to max_num_segments after a
+                successful load. Only worthwhile for indices that stop being written.
+            max_num_segments (int): Number of segments per shard to merge down to.
+
+        Yields:
+            previous (dict): The index settings that will be restored, or None if they
+            could not be read.
+        """
+        previous = None
+        try:
+            current = self.client.indices.get_settings(index=index_name, flat_settings=True)
+            current = next(iter(current.values()))["settings"]
+            # unset settings are restored to the cluster default with None
+            previous = {
+                "index.refresh_interval": current.get("index.refresh_interval"),
+                "index.number_of_replicas": current.get("index.number_of_replicas"),
+            }
+            self.client.indices.put_settings(index=index_name, body={
+                "index.refresh_interval": refresh_interval,
+                "index.number_of_replicas": number_of_replicas,
+            })
+        except Exception as e:
+            print(f"An error occurred while entering bulk load mode: {e}")
+
+        try:
+            yield previous
+            if force_merge:
+                self.client.indices.forcemerge(index=index_name, max_num_segments=max_num_segments,
+                                               request_timeout=3600)
+        finally:
+            try:
+                if previous is not None:
+                    self.client.indices.put_settings(index=index_name, body=previous)
+                self.refresh_index(index_name)
+            except Exception as e:
+                print(f"An error occurred while leaving bulk load mode: {e}")
+
+    @_instrumented
+    def create_document(self, index_name, doc_id, document, refresh=None):
+        """
+        Create a document within an index.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            document (dict or bytes): The document data. Already serialized JSON is sent as is.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            response = self.client.index(index=index_name, id=doc_id, body=document, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while creating document: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    @_instrumented
+    def bulk_index_documents(self, index_name, documents, id_field=None, chunk_size=500, max_chunk_bytes=10485760,
+                             max_retries=3, refresh=None):
+        """
+        Index many documents through the _bulk API.
+
+        Documents are consumed lazily, so any iterable or generator can be streamed
+        without loading it into memory. They are sent in chunks bounded both by
+        document count and by request body size.
+
+        Parameters:
+            index_name (str): The name of the index.
+            documents (iterable): Documents to index. Each item is either a document
+                or a (doc_id, document) tuple. A document is a dict or already
+                serialized JSON as bytes, which is forwarded without re-encoding.
+            id_field (str): Optional document field to use as the document ID.
+            chunk_size (int): Maximum number of documents per _bulk request.
+            max_chunk_bytes (int): Maximum size in bytes of a _bulk request body.
+            max_retries (int): How many times items rejected with 429 are retried.
+            refresh: True or "wait_for" to make the documents searchable before returning.
+                It is applied to the last _bulk request, sent once all others completed.
+
+        Returns:
+            response (dict): Number of indexed documents, a list of per-item errors and
+            the number of retried requests.
+        """
+        try:
+            actions = self._iter_index_actions(index_name, documents, id_field)
+            return self._send_actions(actions, chunk_size, max_chunk_bytes, max_retries, refresh)
+        except Exception as e:
+            print(f"An error occurred while bulk indexing documents: {e}")
+            return None
+
+    @_instrumented
+    def parallel_bulk_index_documents(self, index_name, documents, id_field=None, workers=4, max_in_flight=None,
+                                      chunk_size=500, max_chunk_bytes=10485760, max_retries=5, refresh=None):
+        """
+        Index many documents with several _bulk requests in flight at once.
+
+        Chunks are built on the calling thread and handed to a pool of worker threads.
+        At most max_in_flight chunks are queued or running at any time, so a fast
+        producer blocks instead of buffering the whole input. Requests and items
+        rejected with 429 are retried with exponential backoff and jitter.
+
+        The summary exposes where the cluster saturates: "retries" counts requests
+        repeated after 429 rejections and "producer_wait_seconds" is the time spent
+        waiting for a free slot because every worker was busy.
+
+        Parameters:
+            index_name (str): The name of the index.
+            documents (iterable): Documents to index, as for bulk_index_documents.
+            id_field (str): Optional document field to use as the document ID.
+            workers (int): Number of worker threads sending _bulk requests.
+            max_in_flight (int): Maximum number of chunks queued or running. Default is
+                twice the number of workers.
+            chunk_size (int): Maximum number of documents per _bulk request.
+            max_chunk_bytes (int): Maximum size in bytes of a _bulk request body.
+            max_retries (int): How many times items rejected with 429 are retried.
+            refresh: True or "wait_for" to make the documents searchable before returning.
+                It is applied to the last _bulk request, sent once all others completed.
+
+        Returns:
+            response (dict): Indexing summary with per-item errors and throughput.
+        """
+        try:
+            actions = self._iter_index_actions(index_name, documents, id_field)
+            return self._send_actions_in_parallel(actions, workers, max_in_flight, chunk_size, max_chunk_bytes,
+                                                  max_retries, refresh)
+        except Exception as e:
+            print(f"An error occurred while parallel bulk indexing documents: {e}")
+            return None
+
+    @_instrumented
+    def bulk_index_file(self, index_name, path, id_field=None, routing_field=None, workers=1, max_in_flight=None,
+                        chunk_size=500, max_chunk_bytes=10485760, max_retries=3, refresh=None):
+        """
+        Index a newline-delimited JSON file with one document per line.
+
+        The file is memory-mapped and each line is sliced straight into the _bulk
+        request body, so documents are never decoded into dicts or re-encoded. A line
+        is only parsed when id_field or routing_field must be read from it. Blank
+        lines are skipped.
+
+        Parameters:
+            index_name (str): The name of the index.
+            path (str): Path of the NDJSON file.
+            id_field (str): Optional document field to use as the document ID.
+            routing_field (str): Optional document field to use as the routing value.
+            workers (int): Number of worker threads sending _bulk requests. With one
+                worker the requests are sent from the calling thread.
+            max_in_flight (int): Maximum number of chunks queued or running when workers
+                is greater than one. Default is twice the number of workers.
+            chunk_size (int): Maximum number of documents per _bulk request.
+            max_chunk_bytes (int): Maximum size in bytes of a _bulk request body.
+            max_retries (int): How many times items rejected with 429 are retried.
+            refresh: True or "wait_for" to make the documents searchable before returning.
+                It is applied to the last _bulk request, sent once all others completed.
+
+        Returns:
+            response (dict): Indexing summary, as for bulk_index_documents or
+                parallel_bulk_index_documents.
+        """
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return {"indexed": 0, "errors": [], "retries": 0}
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    actions = self._iter_file_actions(index_name, mapped, id_field, routing_field)
+                    if workers > 1:
+                        return self._send_actions_in_parallel(actions, workers, max_in_flight, chunk_size,
+                                                              max_chunk_bytes, max_retries, refresh)
+                    return self._send_actions(actions, chunk_size, max_chunk_bytes, max_retries, refresh)
+        except Exception as e:
+            print(f"An error occurred while bulk indexing file {path}: {e}")
+            return None
+
+    def _send_actions(self, actions, chunk_size, max_chunk_bytes, max_retries, refresh=None):
+        """
+        Send encoded actions in chunks, one _bulk request at a time. The refresh
+        policy is only applied to the last request.
+
+        Returns:
+            summary (dict): Number of successful items, item errors and retries.
+        """
+        summary = {"indexed": 0, "errors": [], "retries": 0}
+        for chunk, last in _mark_last(self._iter_bulk_chunks(actions, chunk_size, max_chunk_bytes)):
+            indexed, errors, retries = self._send_bulk_chunk(chunk, max_retries=max_retries,
+                                                             refresh=refresh if last else None)
+            summary["indexed"] += indexed
+            summary["errors"].extend(errors)
+            summary["retries"] += retries
+        return summary
+
+    def _send_actions_in_parallel(self, actions, workers, max_in_flight, chunk_size, max_chunk_bytes, max_retries,
+                                  refresh=None):
+        """
+        Send encoded actions in chunks from a pool of worker threads.
+
+        With a refresh policy the last chunk is held back until every other chunk
+        completed, then sent with it, so the refresh covers all of them.
+
+        Returns:
+            summary (dict): As for _send_actions, plus producer wait time and throughput.
+        """
+        summary = {"indexed": 0, "errors": [], "retries": 0, "producer_wait_seconds": 0.0}
+        slots = threading.BoundedSemaphore(max_in_flight or workers * 2)
+
+        def send(chunk):
+            try:
+                return self._send_bulk_chunk(chunk, max_retries=max_retries)
+            finally:
+                slots.release()
+
+        def collect(result):
+            indexed, errors, retries = result
+            summary["indexed"] += indexed
+            summary["errors"].extend(errors)
+            summary["retries"] += retries
+
+        start = time.perf_counter()
+        pending = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            last_chunk = None
+            for chunk, last in _mark_last(self._iter_bulk_chunks(actions, chunk_size, max_chunk_bytes)):
+                if last and refresh:
+                    last_chunk = chunk
+                    break
+                wait_start = time.perf_counter()
+                slots.acquire()
+                summary["producer_wait_seconds"] += time.perf_counter() - wait_start
+
+                pending.append(executor.submit(contextvars.copy_context().run, send, chunk))
+                for future in [f for f in pending if f.done()]:
+                    pending.remove(future)
+                    collect(future.result())
+            for future in pending:
+                collect(future.result())
+        if last_chunk is not None:
+            collect(self._send_bulk_chunk(last_chunk, max_retries=max_retries, refresh=refresh))
+
+        elapsed = time.perf_counter() - start
+        summary["elapsed_seconds"] = elapsed
+        summary["docs_per_second"] = summary["indexed"] / elapsed if elapsed else 0.0
+        return summary
+
+    @_instrumented
+    def find_bulk_saturation_point(self, index_name, make_documents, worker_counts=(1, 2, 4, 8, 16), min_gain=0.1,
+                                   **bulk_kwargs):
+        """
+        Measure parallel bulk throughput at increasing worker counts.
+
+        The saturation point is the first worker count whose throughput improves on
+        the previous one by less than min_gain, or which was throttled with 429s.
+
+        Parameters:
+            index_name (str): The name of the index to write to.
+            make_documents (callable): Returns a fresh iterable of documents for each run.
+            worker_counts (iterable): Worker counts to try, in increasing order.
+            min_gain (float): Minimum relative throughput gain to keep scaling.
+            **bulk_kwargs: Extra arguments for parallel_bulk_index_documents.
+
+        Returns:
+            response (dict): Per-run summaries and the saturating worker count.
+        """
+        runs = []
+        saturation = None
+        previous_rate = None
+        for workers in worker_counts:
+            summary = self.parallel_bulk_index_documents(index_name, make_documents(), workers=workers, **bulk_kwargs)
+            if summary is None:
+                break
+            rate = summary["docs_per_second"]
+            runs.append({"workers": workers, "docs_per_second": rate, "retries": summary["retries"],
+                         "producer_wait_seconds": summary["producer_wait_seconds"]})
+            if summary["retries"] or (previous_rate is not None and rate < previous_rate * (1 + min_gain)):
+                saturation = workers
+                break
+            previous_rate = rate
+        return {"runs": runs, "saturation_workers": saturation}
+
+    def _iter_index_actions(self, index_name, documents, id_field=None):
+        """
+        Encode documents as _bulk index actions.
+
+        Yields:
+            (index_name, doc_id, payload) tuples where payload holds the action and
+            source lines.
+        """
+        for item in documents:
+            if isinstance(item, tuple):
+                doc_id, document = item
+            else:
+                doc_id, document = None, item
+
+            if isinstance(document, str):
+                document = document.encode("utf-8")
+            if isinstance(document, bytes):
+                source = document.rstrip(b"\r\n")
+                if doc_id is None and id_field is not None:
+                    doc_id = self.serializer.loads(source)[id_field]
+            else:
+                source = self._encode(document)
+                if doc_id is None and id_field is not None:
+                    doc_id = document[id_field]
+
+            action = {"index": {"_index": index_name}}
+            if doc_id is not None:
+                action["index"]["_id"] = doc_id
+            yield index_name, doc_id, self._encode(action) + b"\n" + source + b"\n"
+
+    def _iter_file_actions(self, index_name, mapped, id_field=None, routing_field=None):
+        """
+        Encode the lines of a memory-mapped NDJSON file as _bulk index actions.
+
+        Yields:
+            (index_name, doc_id, payload) tuples, as for _iter_index_actions.
+        """
+        header = self._encode({"index": {"_index": index_name}}) + b"\n"
+        view = memoryview(mapped)
+        line = None
+        try:
+            size = len(mapped)
+            start = 0
+            while start < size:
+                end = mapped.find(b"\n", start)
+                if end == -1:
+                    end = size
+                line_start, start = start, end + 1
+                if end > line_start and mapped[end - 1] == 13:
+                    end -= 1
+                if end == line_start:
+                    continue
+                line = view[line_start:end]
+
+                doc_id = None
+                action_header = header
+                if id_field is not None or routing_field is not None:
+                    document = self.serializer.loads(bytes(line))
+                    action = {"_index": index_name}
+                    if id_field is not None:
+                        doc_id = action["_id"] = document[id_field]
+                    if routing_field is not None:
+                        action["routing"] = document[routing_field]
+                    action_header = self._encode({"index": action}) + b"\n"
+                yield index_name, doc_id, b"".join((action_header, line, b"\n"))
+        finally:
+            # Slices must be dropped before the view can be released and the map closed.
+            line = None
+            view.release()
+
+    def _encode(self, data):
+        """
+        Serialize data to UTF-8 JSON bytes with the configured serializer.
+        """
+        encoded = self.serializer.dumps(data)
+        return encoded if isinstance(encoded, bytes) else encoded.encode("utf-8")
+
+    def _iter_bulk_chunks(self, actions, chunk_size, max_chunk_bytes):
+        """
+        Group encoded actions into chunks bounded by count and byte size.
+
+        A single action larger than max_chunk_bytes is sent on its own.
+        """
+        chunk = []
+        chunk_bytes = 0
+        for action in actions:
+            action_bytes = len(action[2])
+            if chunk and (len(chunk) >= chunk_size or chunk_bytes + action_bytes > max_chunk_bytes):
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(action)
+            chunk_bytes += action_bytes
+        if chunk:
+            yield chunk
+
+    def _send_bulk_chunk(self, chunk, max_retries=0, initial_backoff=0.5, max_backoff=30.0, refresh=None):
+        """
+        Send one chunk of encoded actions as a single _bulk request.
+
+        Requests and items rejected with 429 (Too Many Requests) are retried up to
+        max_retries times, sleeping for an exponentially growing, jittered backoff
+        between attempts. Any other failure of the whole request is reported against
+        every item in the chunk.
+
+        Returns:
+            (succeeded, errors, retries): Number of successful items, a list of item
+            errors and the number of retried requests.
+        """
+        try:
+            return self._send_bulk_actions(chunk, max_retries, initial_backoff, max_backoff, refresh)
+        finally:
+            if self.document_cache is not None:
+                for index_name, doc_id, _ in chunk:
+                    if doc_id is not None:
+                        self.document_cache.invalidate(index_name, doc_id)
+            # auto-ID actions change search results too, so every index written to
+            # starts a new generation, once per chunk
+            if self.search_cache is not None:
+                for index_name in {index_name for index_name, _, _ in chunk}:
+                    self.search_cache.bump(index_name)
+
+    def _count_retry(self, reason):
+        """
+        Record a request repeated by the interface against the call in progress.
+        """
+        if self.metrics is not None:
+            self.metrics.increment("es_interface_retries_total", reason=reason, **_call_labels())
+
+    def _send_bulk_actions(self, chunk, max_retries, initial_backoff, max_backoff, refresh):
+        succeeded = 0
+        errors = []
+        retries = 0
+        pending = chunk
+        for attempt in range(max_retries + 1):
+            if attempt:
+                retries += 1
+                self._count_retry("too_many_requests")
+                time.sleep(random.uniform(0, min(max_backoff, initial_backoff * 2 ** (attempt - 1))))
+
+            try:
+                response = self.client.bulk(body=b"".join(payload for _, _, payload in pending), refresh=refresh)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status == 429 and attempt < max_retries:
+                    continue
+                errors.extend({"_index": index_name, "_id": doc_id, "status": status, "error": str(e)}
+                              for index_name, doc_id, _ in pending)
+                return succeeded, errors, retries
+
+            if not response.get("errors"):
+                return succeeded + len(response["items"]), errors, retries
+
+            rejected = []
+            for action, item in zip(pending, response["items"]):
+                result = next(iter(item.values()))
+                if "error" not in result:
+                    succeeded += 1
+                elif result.get("status") == 429 and attempt < max_retries:
+                    rejected.append(action)
+                else:
+                    errors.append({"_index": action[0], "_id": result.get("_id"), "status": result.get("status"),
+                                   "error": result["error"]})
+            if not rejected:
+                break
+            pending = rejected
+        return succeeded, errors, retries
+
+    @_instrumented
+    def delete_index(self, index_name):
+        """
+        Delete an Elasticsearch index.
+
+        Parameters:
+            index_name (str): The name of the index to delete.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            response = self.client.indices.delete(index=index_name)
+            return response
+        except Exception as e:
+            print(f"An error occurred while deleting index: {e}")
+            return None
+        finally:
+            self._invalidate(index_name)
+
+    @_instrumented
+    def get_document(self, index_name, doc_id):
+        """
+        Get a document from an Elasticsearch index.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document to retrieve.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            return self._get_source(index_name, doc_id)
+        except Exception as e:
+            print(f"An error occurred while getting document: {e}")
+            return None
+
+    @_instrumented
+    def refresh_index(self, index_name):
+        """
+        Refresh an Elasticsearch index.
+
+        Concurrent calls for the same index share refresh requests: a call waits for
+        the next refresh that starts after it was made, and sends it only if no other
+        caller is about to. Every write acknowledged before the call is searchable
+        when it returns, without one refresh, and one new segment, per caller. Prefer
+        refresh="wait_for" on the write itself where possible.
+
+        Parameters:
+            index_name (str): The name of the index to refresh.
+
+        Returns:
+            response (dict): Elasticsearch response, shared between coalesced callers.
+        """
+        requested_at = time.monotonic()
+        response = None
+        try:
+            with self._refreshes_lock:
+                refresh = self._refreshes.setdefault(index_name, _CoalescedRefresh())
+            response = refresh.run(lambda: self.client.indices.refresh(index=index_name),
+                                   self.refresh_coalesce_window)
+            return response
+        except Exception as e:
+            print(f"An error occurred while refreshing index: {e}")
+            return None
+        finally:
+            if self.search_cache is not None:
+                self.search_cache.refreshed(index_name, requested_at if response is not None else None)
+
+    @_instrumented
+    def search_document(self, index_name, query):
+        """
+        Search for documents in an Elasticsearch index.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): The query to search for documents.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            response = self._search(index_name, query)
+            return response['hits']['hits']
+        except Exception as e:
+            print(f"An error occurred while searching for document: {e}")
+            return None
+
+    @_instrumented
+    def get_versioned_document(self, index_name, doc_id):
+        """
+        Get a document together with the values needed for optimistic concurrency control.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document to retrieve.
+
+        Returns:
+            response (dict): The document's _source, _seq_no and _primary_term.
+        """
+        try:
+            response = self.client.get(index=index_name, id=doc_id)
+            return {key: response[key] for key in ("_source", "_seq_no", "_primary_term")}
+        except Exception as e:
+            print(f"An error occurred while getting versioned document: {e}")
+            return None
+
+    @_instrumented
+    def read_modify_write_document(self, index_name, doc_id, modify, max_attempts=5, refresh=None):
+        """
+        Replace a document with a modified copy unless another writer changed it first.
+
+        The document is read, passed to modify and written back on condition that
+        its sequence number and primary term are unchanged. On a version conflict
+        the cycle is repeated with the latest version, up to max_attempts times, so
+        parallel writers cannot silently overwrite each other.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            modify (callable): Takes the current _source and returns the new _source.
+            max_attempts (int): Maximum number of read-modify-write cycles.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response, or None if every attempt conflicted.
+        """
+        try:
+            for _ in range(max_attempts):
+                current = self.client.get(index=index_name, id=doc_id)
+                document = modify(current["_source"])
+                try:
+                    return self.client.index(index=index_name, id=doc_id, body=document,
+                                             if_seq_no=current["_seq_no"], if_primary_term=current["_primary_term"],
+                                             refresh=refresh)
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 409:
+                        raise
+                    self._count_retry("version_conflict")
+            print(f"Giving up on document '{doc_id}' after {max_attempts} version conflicts.")
+            return None
+        except Exception as e:
+            print(f"An error occurred while reading, modifying and writing document: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    def _update(self, index_name, doc_id, body, refresh=None, retry_on_conflict=None, if_seq_no=None,
+                if_primary_term=None):
+        """
+        Send an update request, optionally conditional on a document version.
+
+        Elasticsearch rejects retry_on_conflict on conditional updates, so it is only
+        sent when no if_seq_no is given.
+        """
+        params = {}
+        if if_seq_no is not None:
+            params["if_seq_no"] = if_seq_no
+            params["if_primary_term"] = if_primary_term
+        elif retry_on_conflict:
+            params["retry_on_conflict"] = retry_on_conflict
+        return self.client.update(index=index_name, id=doc_id, body=body, refresh=refresh, **params)
+
+    @_instrumented
+    def update_document(self, index_name, doc_id, updated_document, if_seq_no=None, if_primary_term=None, refresh=None):
+        """
+        Update a document in an Elasticsearch index.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document to update.
+            updated_document (dict): The updated document data.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response, or a Future when the update was
+                queued in the write-behind buffer.
+        """
+        try:
+            if self.write_behind is not None and if_seq_no is None and if_primary_term is None and refresh is None:
+                return self.write_behind.update(index_name, doc_id, updated_document)
+            response = self._update(index_name, doc_id, {"doc": updated_document}, if_seq_no=if_seq_no,
+                                    if_primary_term=if_primary_term, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while updating document: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    @_instrumented
+    def delete_document(self, index_name, doc_id, refresh=None):
+        """
+        Delete a document from an Elasticsearch index.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document to delete.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            response = self.client.delete(index=index_name, id=doc_id, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while deleting document: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+        
+    @_instrumented
+    def create_field_in_document(self, index_name, doc_id, field_name, field_value, if_seq_no=None,
+                                 if_primary_term=None, refresh=None):
+        """
+        Create a new field in a document.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            field_name (str): The name of the new field. Dots address nested objects.
+            field_value: The value of the new field. Numbers, lists and objects keep their type.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response, or a Future when the update was
+                queued in the write-behind buffer.
+        """
+        try:
+            # a buffered partial doc would merge an object value into the existing
+            # object, where the script replaces it
+            if (self.write_behind is not None and if_seq_no is None and if_primary_term is None and refresh is None
+                    and not isinstance(field_value, dict)):
+                return self.write_behind.set_field(index_name, doc_id, field_name, field_value)
+            script = _script(SET_FIELD_SCRIPT, field=field_name, value=field_value)
+            response = self._update(index_name, doc_id, {"script": script}, if_seq_no=if_seq_no,
+                                    if_primary_term=if_primary_term, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while creating field: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+        
+    @_instrumented
+    def delete_field_from_document(self, index_name, doc_id, field_name, if_seq_no=None, if_primary_term=None,
+                                   refresh=None):
+        """
+        Delete a field from a document.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            field_name (str): The name of the field to delete. Dots address nested objects.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            script = _script(REMOVE_FIELD_SCRIPT, field=field_name)
+            response = self._update(index_name, doc_id, {"script": script}, if_seq_no=if_seq_no,
+                                    if_primary_term=if_primary_term, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while deleting field: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+      
+    @_instrumented
+    def update_field_in_document(self, index_name, doc_id, field_name, new_field_value, if_seq_no=None,
+                                 if_primary_term=None, refresh=None):
+        """
+        Update the value of a field in a document.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            field_name (str): The name of the field to update. Dots address nested objects.
+            new_field_value: The new value for the field. Numbers, lists and objects keep their type.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response, or a Future when the update was
+                queued in the write-behind buffer.
+        """
+        try:
+            # a buffered partial doc would merge an object value into the existing
+            # object, where the script replaces it
+            if (self.write_behind is not None and if_seq_no is None and if_primary_term is None and refresh is None
+                    and not isinstance(new_field_value, dict)):
+                return self.write_behind.set_field(index_name, doc_id, field_name, new_field_value)
+            script = _script(SET_FIELD_SCRIPT, field=field_name, value=new_field_value)
+            response = self._update(index_name, doc_id, {"script": script}, if_seq_no=if_seq_no,
+                                    if_primary_term=if_primary_term, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while updating field: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    @_instrumented
+    def create_element_in_object_field(self, index_name, doc_id, object_field_name, element, if_seq_no=None,
+                                       if_primary_term=None, refresh=None):
+        """
+        Create an element in an object field of a document.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            object_field_name (str): The name of the object field. Dots address nested objects.
+            element: The element to create in the object field. Numbers, lists and objects keep their type.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            script = _script(SET_FIELD_SCRIPT, field=object_field_name, value=element)
+            response = self._update(index_name, doc_id, {"script": script}, if_seq_no=if_seq_no,
+                                    if_primary_term=if_primary_term, refresh=refresh)
+            return response
+        except Exception as e:
+            print(f"An error occurred while creating element: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+        
+    @_instrumented
+    def delete_element_from_object_field(self, index_name, doc_id, object_field_name, element, retry_on_conflict=3,
+                                         if_seq_no=None, if_primary_term=None, refresh=None):
+        """
+        Delete an element from a specified object field of a document.
+
+        The element is removed by a script on the server in a single update, so
+        concurrent writers do not lose each other's changes.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            object_field_name (str): The name of the object field containing the element.
+            element (str): The element to delete from the object field.
+            retry_on_conflict (int): How often the update is retried on version conflicts.
+                Ignored when if_seq_no is given.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            script = _script(REMOVE_ELEMENT_SCRIPT, field=object_field_name, element=element)
+            response = self._update(index_name, doc_id, {"script": script}, retry_on_conflict=retry_on_conflict,
+                                    if_seq_no=if_seq_no, if_primary_term=if_primary_term, refresh=refresh)
+            if response.get("result") == "noop":
+                print(f"The specified element '{element}' was not found.")
+                return None
+            return response
+        except Exception as e:
+            print(f"An error occurred while deleting element: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    @_instrumented
+    def update_element_in_object_field(self, index_name, doc_id, object_field_name, old_element, new_element,
+                                       retry_on_conflict=3, if_seq_no=None, if_primary_term=None, refresh=None):
+        """
+        Update an element in a specified object field of a document.
+
+        The element is replaced by a script on the server in a single update, so
+        concurrent writers do not lose each other's changes.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            object_field_name (str): The name of the object field containing the elements.
+            old_element (str): The element to be updated.
+            new_element (str): The updated element.
+            retry_on_conflict (int): How often the update is retried on version conflicts.
+                Ignored when if_seq_no is given.
+            if_seq_no (int): Only update if the document still has this sequence number,
+                as returned by get_versioned_document.
+            if_primary_term (int): Only update if the document still has this primary term.
+            refresh: True to refresh the affected shard, "wait_for" to wait for its next refresh.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            script = _script(REPLACE_ELEMENT_SCRIPT, field=object_field_name, element=old_element,
+                             new_element=new_element)
+            response = self._update(index_name, doc_id, {"script": script}, retry_on_conflict=retry_on_conflict,
+                                    if_seq_no=if_seq_no, if_primary_term=if_primary_term, refresh=refresh)
+            if response.get("result") == "noop":
+                print(f"The specified old element '{old_element}' was not found.")
+                return None
+            return response
+        except Exception as e:
+            print(f"An error occurred while updating element: {e}")
+            return None
+        finally:
+            self._invalidate(index_name, doc_id)
+
+    @_instrumented
+    def bulk_update_elements_in_object_field(self, index_name, doc_ids, object_field_name, element, new_element=None,
+                                             retry_on_conflict=3, chunk_size=500, max_chunk_bytes=10485760,
+                                             max_retries=3, refresh=None):
+        """
+        Apply the same element operation to many documents through _bulk update actions.
+
+        Without new_element the element is deleted from every document, otherwise it
+        is replaced by new_element. Documents that do not contain the element are
+        left unchanged.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_ids (iterable): IDs of the documents to update.
+            object_field_name (str): The name of the object field containing the elements.
+            element: The element to delete or replace.
+            new_element: The replacement element, or None to delete.
+            retry_on_conflict (int): How often each update is retried on version conflicts.
+            chunk_size (int): Maximum number of updates per _bulk request.
+            max_chunk_bytes (int): Maximum size in bytes of a _bulk request body.
+            max_retries (int): How many times updates rejected with 429 are retried.
+            refresh: True or "wait_for" to make the documents searchable before returning.
+                It is applied to the last _bulk request, sent once all others completed.
+
+        Returns:
+            response (dict): Number of updated documents, a list of per-item errors and
+            the number of retried requests.
+        """
+        try:
+            if new_element is None:
+                script = _script(REMOVE_ELEMENT_SCRIPT, field=object_field_name, element=element)
+            else:
+                script = _script(REPLACE_ELEMENT_SCRIPT, field=object_field_name, element=element,
+                                 new_element=new_element)
+            source_line = self._encode({"script": script}) + b"\n"
+
+            def actions():
+                for doc_id in doc_ids:
+                    action = {"update": {"_index": index_name, "_id": doc_id, "retry_on_conflict": retry_on_conflict}}
+                    yield index_name, doc_id, self._encode(action) + b"\n" + source_line
+
+            summary = {"updated": 0, "errors": [], "retries": 0}
+            for chunk, last in _mark_last(self._iter_bulk_chunks(actions(), chunk_size, max_chunk_bytes)):
+                updated, errors, retries = self._send_bulk_chunk(chunk, max_retries=max_retries,
+                                                                 refresh=refresh if last else None)
+                summary["updated"] += updated
+                summary["errors"].extend(errors)
+                summary["retries"] += retries
+            return summary
+        except Exception as e:
+            print(f"An error occurred while bulk updating elements: {e}")
+            return None
+
+    @_instrumented
+    def get_full_document_by_id(self, index_name, doc_id):
+        """
+        Get the full document by its ID.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+
+        Returns:
+            response (dict): Elasticsearch response document data.
+        """
+        try:
+            return self._get_source(index_name, doc_id)
+        except Exception as e:
+            print(f"An error occurred while getting full document: {e}")
+            return None
+            
+    @_instrumented
+    def get_partial_document(self, index_name, doc_id, fields):
+        """
+        Get specific fields of a document by its ID.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_id (str): The ID of the document.
+            fields (list): List of field names to retrieve.
+
+        Returns:
+            response (dict): Elasticsearch response document data.
+        """
+        try:
+            return self._get_source(index_name, doc_id, fields)
+        except Exception as e:
+            print(f"An error occurred while getting partial document: {e}")
+            return None
+
+    def _get_source(self, index_name, doc_id, fields=None):
+        """
+        Fetch a document source, reading through the document cache when enabled.
+        """
+        if self.document_cache is None:
+            return self._fetch_source(index_name, doc_id, fields)
+
+        found, source, token = self.document_cache.lookup(index_name, doc_id, fields)
+        if found:
+            return source
+        source = self._fetch_source(index_name, doc_id, fields)
+        self.document_cache.store(index_name, doc_id, fields, source, token)
+        return source
+
+    def _fetch_source(self, index_name, doc_id, fields=None):
+        if fields is None:
+            response = self.client.get(index=index_name, id=doc_id)
+        else:
+            response = self.client.get(index=index_name, id=doc_id, _source=fields)
+        return response['_source']
+
+    def _invalidate(self, index_name, doc_id=None):
+        """
+        Drop cached reads made stale by a write through this interface.
+
+        Parameters:
+            index_name (str): The index that was written to.
+            doc_id (str): The written document, or None when any document may have changed.
+        """
+        if self.document_cache is not None:
+            self.document_cache.invalidate(index_name, doc_id)
+        if self.search_cache is not None:
+            self.search_cache.bump(index_name)
+
+    def _search(self, index_name, body):
+        """
+        Run a search, reading through the search cache when enabled.
+        """
+        if self.search_cache is None:
+            return self._send_search(index_name, body)
+
+        found, response, token = self.search_cache.lookup(index_name, body)
+        if found:
+            return response
+        response = self._send_search(index_name, body)
+        self.search_cache.store(index_name, body, response, token)
+        return response
+
+    def _send_search(self, index_name, body):
+        if self.query_profiler is None:
+            return self.client.search(index=index_name, body=body)
+        return self.query_profiler.search(self.client, index_name, body)
+       
+    @_instrumented
+    def search_documents_by_query(self, index_name, query):
+        """
+        Search for documents using a complex query.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): The complex query containing combinations of must, must_not, should, etc.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            response = self._search(index_name, query)
+            return response
+        except Exception as e:
+            print(f"An error occurred while searching for documents by query: {e}")
+            return None
+      
+    @_instrumented
+    def get_all_documents(self, index_name):
+        """
+        Retrieve all documents from an index.
+
+        Only the first page of hits is returned. Use iter_all_documents to stream
+        every document of a large index.
+
+        Parameters:
+            index_name (str): The name of the index.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            query = {"query": {"match_all": {}}}
+            response = self.client.search(index=index_name, body=query)
+            return response 
+        except Exception as e:
+            print(f"An error occurred while retrieving all documents: {e}")
+            return None
+
+    @_instrumented
+    def iter_all_documents(self, index_name, query=None, source=None, page_size=1000, keep_alive="1m"):
+        """
+        Stream every document matching a query, one hit at a time.
+
+        Pages through the index with a point in time and search_after, falling back
+        to the scroll API when point in time is unavailable. Only one page of hits
+        is held in memory at a time. A failed request is raised after it is printed,
+        so an export cut short cannot be mistaken for a complete one.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): Optional query clause. Default is match_all.
+            source: Optional _source filter, e.g. a list of fields or False.
+            page_size (int): Number of hits fetched per request.
+            keep_alive (str): How long the point in time or scroll context is kept
+                between requests.
+
+        Yields:
+            hit (dict): Elasticsearch hit including _id and _source.
+        """
+        try:
+            body = self._build_export_body(query, source, page_size)
+            for hits in self._iter_search_pages(index_name, body, keep_alive):
+                yield from hits
+        except Exception as e:
+            print(f"An error occurred while iterating over all documents: {e}")
+            raise
+
+    @_instrumented
+    def iter_all_documents_sliced(self, index_name, query=None, source=None, slices=None, workers=None, ordered=False,
+                                  page_size=1000, keep_alive="1m", max_buffered_pages=4):
+        """
+        Stream every document matching a query using a sliced scan drained in parallel.
+
+        The search is split into slices that share one point in time (or use one
+        sliced scroll each as a fallback). Each slice is paged by a worker thread and
+        the hits are merged into a single iterator. Workers block once their buffer
+        of pages is full, so memory stays bounded by the buffers. As with
+        iter_all_documents, a failed request in any slice is raised.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): Optional query clause. Default is match_all.
+            source: Optional _source filter, e.g. a list of fields or False.
+            slices (int): Number of slices. Default is the number of primary shards.
+            workers (int): Number of worker threads. Default is one per slice.
+            ordered (bool): Yield slices one after another in slice order instead of
+                interleaving hits as soon as any slice returns a page.
+            page_size (int): Number of hits fetched per request and slice.
+            keep_alive (str): How long the point in time or scroll context is kept
+                between requests.
+            max_buffered_pages (int): Pages buffered per slice when ordered, or in
+                total when unordered.
+
+        Yields:
+            hit (dict): Elasticsearch hit including _id and _source.
+        """
+        try:
+            slices = slices or self._count_primary_shards(index_name)
+            if slices < 2:
+                yield from self.iter_all_documents(index_name, query, source, page_size, keep_alive)
+                return
+
+            body = self._build_export_body(query, source, page_size)
+            pit_id = self._open_point_in_time(index_name, keep_alive)
+            stop = threading.Event()
+            buffers = [queue.Queue(max_buffered_pages) for _ in range(slices if ordered else 1)]
+
+            def put(buffer, item):
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        return True
+                    except queue.Full:
+                        continue
+                return False
+
+            def drain(slice_id):
+                buffer = buffers[slice_id if ordered else 0]
+                slice_body = dict(body, slice={"id": slice_id, "max": slices})
+                if pit_id is not None:
+                    pages = self._iter_pit_pages(slice_body, pit_id, keep_alive)
+                else:
+                    pages = self._iter_scroll_pages(index_name, slice_body, keep_alive)
+                try:
+                    for hits in pages:
+                        if not put(buffer, ("hits", hits)):
+                            return
+                    put(buffer, ("done", None))
+                except Exception as e:
+                    put(buffer, ("error", e))
+                finally:
+                    pages.close()
+
+            executor = ThreadPoolExecutor(max_workers=workers or slices)
+            try:
+                for slice_id in range(slices):
+                    executor.submit(contextvars.copy_context().run, drain, slice_id)
+
+                remaining = slices
+                buffer_id = 0
+                while remaining:
+                    kind, value = buffers[buffer_id].get()
+                    if kind == "hits":
+                        yield from value
+                        continue
+                    if kind == "error":
+                        raise value
+                    remaining -= 1
+                    if ordered:
+                        buffer_id += 1
+            finally:
+                stop.set()
+                executor.shutdown(wait=True)
+                if pit_id is not None:
+                    self._close_point_in_time(pit_id)
+        except Exception as e:
+            print(f"An error occurred while iterating over sliced documents: {e}")
+            raise
+
+    def _count_primary_shards(self, index_name):
+        """
+        Count the primary shards of every index matched by index_name.
+        """
+        try:
+            response = self.client.indices.get_settings(index=index_name, name="index.number_of_shards")
+            return sum(int(index["settings"]["index"]["number_of_shards"]) for index in response.values())
+        except Exception:
+            return os.cpu_count() or 1
+
+    @_instrumented
+    def get_field_types(self, index_name, fields):
+        """
+        Look up the mapped type of fields.
+
+        Parameters:
+            index_name (str): The name of the index.
+            fields (list): Field names.
+
+        Returns:
+            response (dict): Field name to Elasticsearch type, for mapped fields only.
+        """
+        try:
+            response = self.client.indices.get_field_mapping(index=index_name, fields=fields)
+            field_types = {}
+            for index_mapping in response.values():
+                for name, field_mapping in index_mapping["mappings"].items():
+                    for mapping in field_mapping["mapping"].values():
+                        field_types.setdefault(name, mapping.get("type"))
+            return field_types
+        except Exception as e:
+            print(f"An error occurred while getting field types: {e}")
+            return None
+
+    @_instrumented
+    def search_columns(self, index_name, fields, query=None, size=10, output="numpy"):
+        """
+        Search and return the hits as typed columns instead of a list of dicts.
+
+        Values are read from doc values where the field has them and from the fields
+        API otherwise, so no _source is transferred or parsed. Multi-valued fields
+        contribute their first value.
+
+        Parameters:
+            index_name (str): The name of the index.
+            fields (list): Fields to return as columns. An "_id" column is always added.
+            query (dict): Optional query clause. Default is match_all.
+            size (int): Number of hits to return.
+            output (str): 'numpy' for a dict of arrays, 'arrow' for a pyarrow
+                RecordBatch or 'dict' for a dict of lists.
+
+        Returns:
+            columns: The hits in the requested columnar format.
+        """
+        try:
+            field_types = self.get_field_types(index_name, fields) or {}
+            body = dict(self._build_columnar_body(fields, field_types), query=query or {"match_all": {}}, size=size)
+            response = self._search(index_name, body)
+            return _build_columns(self._hits_to_columns(response["hits"]["hits"], fields, field_types),
+                                  field_types, output)
+        except Exception as e:
+            print(f"An error occurred while searching columns: {e}")
+            return None
+
+    @_instrumented
+    def iter_column_batches(self, index_name, fields, query=None, page_size=10000, output="numpy", keep_alive="1m"):
+        """
+        Stream every document matching a query as columnar batches, one per page.
+
+        Pages through the index like iter_all_documents, reading values as in
+        search_columns, and raises like it when a request fails.
+
+        Parameters:
+            index_name (str): The name of the index.
+            fields (list): Fields to return as columns. An "_id" column is always added.
+            query (dict): Optional query clause. Default is match_all.
+            page_size (int): Number of hits per batch.
+            output (str): 'numpy', 'arrow' or 'dict', as for search_columns.
+            keep_alive (str): How long the point in time or scroll context is kept
+                between requests.
+
+        Yields:
+            columns: One batch of hits in the requested columnar format.
+        """
+        try:
+            field_types = self.get_field_types(index_name, fields) or {}
+            body = dict(self._build_export_body(query, None, page_size), **self._build_columnar_body(fields, field_types))
+            for hits in self._iter_search_pages(index_name, body, keep_alive):
+                yield _build_columns(self._hits_to_columns(hits, fields, field_types), field_types, output)
+        except Exception as e:
+            print(f"An error occurred while iterating over column batches: {e}")
+            raise
+
+    def _build_columnar_body(self, fields, field_types):
+        """
+        Request fields from doc values where possible and from the fields API otherwise.
+        """
+        docvalue_fields = []
+        fetched_fields = []
+        for name in fields:
+            field_type = field_types.get(name)
+            if field_type == "date":
+                docvalue_fields.append({"field": name, "format": "epoch_millis"})
+            elif field_type in (None, "text", "object", "nested"):
+                fetched_fields.append(name)
+            else:
+                docvalue_fields.append(name)
+
+        body = {"_source": False}
+        if docvalue_fields:
+            body["docvalue_fields"] = docvalue_fields
+        if fetched_fields:
+            body["fields"] = fetched_fields
+        return body
+
+    def _hits_to_columns(self, hits, fields, field_types):
+        columns = {"_id": [hit["_id"] for hit in hits]}
+        for name in fields:
+            values = [hit.get("fields", {}).get(name, (None,))[0] for hit in hits]
+            if field_types.get(name) == "date":
+                values = [None if value is None else int(float(value)) for value in values]
+            columns[name] = values
+        return columns
+
+    def _iter_search_pages(self, index_name, body, keep_alive="1m"):
+        """
+        Yield successive pages of hits for a search body, using point in time when available.
+        """
+        pit_id = self._open_point_in_time(index_name, keep_alive)
+        if pit_id is None:
+            yield from self._iter_scroll_pages(index_name, body, keep_alive)
+            return
+
+        try:
+            yield from self._iter_pit_pages(body, pit_id, keep_alive)
+        finally:
+            self._close_point_in_time(pit_id)
+
+    def _build_export_body(self, query, source, page_size):
+        body = {"query": query or {"match_all": {}}, "size": page_size, "track_total_hits": False}
+        if source is not None:
+            body["_source"] = source
+        return body
+
+    def _open_point_in_time(self, index_name, keep_alive):
+        """
+        Open a point in time on an index.
+
+        Returns:
+            pit_id (str): The point in time ID, or None if it could not be opened.
+        """
+        try:
+            return self.client.open_point_in_time(index=index_name, keep_alive=keep_alive)["id"]
+        except Exception:
+            return None
+
+    def _close_point_in_time(self, pit_id):
+        try:
+            self.client.close_point_in_time(body={"id": pit_id})
+        except Exception as e:
+            print(f"An error occurred while closing point in time: {e}")
+
+    def _iter_pit_pages(self, body, pit_id, keep_alive):
+        """
+        Yield pages of hits from an open point in time, sorted by _shard_doc.
+        """
+        body = dict(body, pit={"id": pit_id, "keep_alive": keep_alive}, sort=["_shard_doc"])
+        while True:
+            response = self.client.search(body=body)
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            yield hits
+            if len(hits) < body["size"]:
+                return
+            body["pit"]["id"] = response.get("pit_id") or body["pit"]["id"]
+            body["search_after"] = hits[-1]["sort"]
+
+    def _iter_scroll_pages(self, index_name, body, keep_alive):
+        """
+        Yield pages of hits using the scroll API, sorted by _doc.
+        """
+        body = dict(body, sort=["_doc"])
+        response = self.client.search(index=index_name, body=body, scroll=keep_alive)
+        scroll_id = response.get("_scroll_id")
+        try:
+            while response["hits"]["hits"]:
+                yield response["hits"]["hits"]
+                response = self.client.scroll(body={"scroll_id": scroll_id, "scroll": keep_alive})
+                scroll_id = response.get("_scroll_id") or scroll_id
+        finally:
+            if scroll_id:
+                try:
+                    self.client.clear_scroll(body={"scroll_id": scroll_id})
+                except Exception as e:
+                    print(f"An error occurred while clearing scroll: {e}")
+ 
+    @_instrumented
+    def get_documents_by_field_value(self, index_name, field_name, field_value):
+        """
+        Retrieve documents that match a specific field and value.
+
+        Parameters:
+            index_name (str): The name of the index.
+            field_name (str): The name of the field to match.
+            field_value: The value to match for the field.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            query = build_field_value_query(field_name, field_value)
+            response = self._search(index_name, query)
+            return response
+        except Exception as e:
+            print(f"An error occurred while retrieving documents by field value: {e}")
+            return None
+      
+    @_instrumented
+    def get_documents_in_field_range(self, index_name, field_name, start_range, end_range):
+        """
+        Retrieve documents within a specified range of values in a field.
+
+        Parameters:
+            index_name (str): The name of the index.
+            field_name (str): The name of the field.
+            start_range: The start of the range (inclusive).
+            end_range: The end of the range (inclusive).
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            query = build_field_range_query(field_name, start_range, end_range)
+            response = self._search(index_name, query)
+            return response
+        except Exception as e:
+            print(f"An error occurred while retrieving documents within field range: {e}")
+            return None
+        
+    @_instrumented
+    def combine_queries_with_boolean_logic(self, index_name, must_queries=None, must_not_queries=None, should_queries=None):
+        """
+        Combine multiple queries using boolean logic (AND, OR, NOT).
+
+        Parameters:
+            index_name (str): The name of the index.
+            must_queries (list): List of queries that must match (AND).
+            must_not_queries (list): List of queries that must not match (NOT).
+            should_queries (list): List of queries where at least one should match (OR).
 
-class ElasticsearchInterface:
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            query = build_boolean_query(must_queries, must_not_queries, should_queries)
+            response = self._search(index_name, query)
+            return response
+        except Exception as e:
+            print(f"An error occurred while combining queries with boolean logic: {e}")
+            return None
+
+    @_instrumented
+    def aggregate(self, index_name, aggs, query=None):
+        """
+        Run aggregations without fetching any hits.
+
+        Parameters:
+            index_name (str): The name of the index.
+            aggs: An AggregationBuilder or an "aggs" dict.
+            query (dict): Optional query clause restricting the aggregated documents.
+
+        Returns:
+            response (dict): The "aggregations" section of the Elasticsearch response.
+        """
+        try:
+            body = {"size": 0, "aggs": aggs.to_dict() if isinstance(aggs, AggregationBuilder) else aggs}
+            if query is not None:
+                body["query"] = query
+            response = self._search(index_name, body)
+            return response["aggregations"]
+        except Exception as e:
+            print(f"An error occurred while aggregating: {e}")
+            return None
+
+    @_instrumented
+    def iter_composite_buckets(self, index_name, sources, query=None, aggs=None, page_size=1000):
+        """
+        Stream every bucket of a composite aggregation, one page at a time.
+
+        Pages are requested with after_key, so group-bys over millions of buckets
+        never exceed search.max_buckets or build one enormous response. A failed
+        request is raised rather than ending the iteration early.
+
+        Parameters:
+            index_name (str): The name of the index.
+            sources (list): Composite sources. Each is either a (name, field) pair
+                for a terms source or a raw source dict such as
+                {"day": {"date_histogram": {"field": "sold", "calendar_interval": "day"}}}.
+            query (dict): Optional query clause restricting the aggregated documents.
+            aggs: Optional sub-aggregations computed per bucket, as an
+                AggregationBuilder or an "aggs" dict.
+            page_size (int): Number of buckets fetched per request.
+
+        Yields:
+            bucket (dict): Composite bucket with its "key", "doc_count" and sub-aggregations.
+        """
+        try:
+            composite_sources = [{source[0]: {"terms": {"field": source[1]}}} if isinstance(source, tuple) else source
+                                 for source in sources]
+            composite = {"composite": {"sources": composite_sources, "size": page_size}}
+            if aggs is not None:
+                composite["aggs"] = aggs.to_dict() if isinstance(aggs, AggregationBuilder) else aggs
+            body = {"size": 0, "aggs": {"buckets": composite}}
+            if query is not None:
+                body["query"] = query
+
+            while True:
+                response = self.client.search(index=index_name, body=body)
+                result = response["aggregations"]["buckets"]
+                yield from result["buckets"]
+                if "after_key" not in result or len(result["buckets"]) < page_size:
+                    return
+                composite["composite"]["after"] = result["after_key"]
+        except Exception as e:
+            print(f"An error occurred while iterating over composite buckets: {e}")
+            raise
+
+    @_instrumented
+    def multi_search(self, searches, max_concurrent_searches=None, chunk_size=100):
+        """
+        Run many searches in as few _msearch round trips as possible.
+
+        Searches already held by the search cache are answered locally.
+
+        Parameters:
+            searches (list): List of (index_name, query) pairs. Queries can be built
+                with build_field_value_query, build_field_range_query and
+                build_boolean_query.
+            max_concurrent_searches (int): Maximum number of searches the cluster runs
+                concurrently for one request. Default is chosen by Elasticsearch.
+            chunk_size (int): Maximum number of searches per _msearch request.
+
+        Returns:
+            responses (list): One response per search, in input order. A failed
+            search is returned as a dict with an "error" key.
+        """
+        try:
+            searches = list(searches)
+            responses = [None] * len(searches)
+            pending = []
+            for position, (index_name, query) in enumerate(searches):
+                if self.search_cache is not None:
+                    found, response, token = self.search_cache.lookup(index_name, query)
+                    if found:
+                        responses[position] = response
+                        continue
+                    pending.append((position, index_name, query, token))
+                else:
+                    pending.append((position, index_name, query, None))
+
+            params = {}
+            if max_concurrent_searches is not None:
+                params["max_concurrent_searches"] = max_concurrent_searches
+            for start in range(0, len(pending), chunk_size):
+                chunk = pending[start:start + chunk_size]
+                payload = b"".join(self._encode({"index": index_name}) + b"\n" + self._encode(query) + b"\n"
+                                   for _, index_name, query, _ in chunk)
+                try:
+                    chunk_responses = self.client.msearch(body=payload, **params)["responses"]
+                except Exception as e:
+                    chunk_responses = [{"error": str(e), "status": getattr(e, "status_code", None)}] * len(chunk)
+
+                for (position, index_name, query, token), response in zip(chunk, chunk_responses):
+                    responses[position] = response
+                    if self.search_cache is not None and "error" not in response:
+                        self.search_cache.store(index_name, query, response, token)
+            return responses
+        except Exception as e:
+            print(f"An error occurred while running multi search: {e}")
+            return None
+
+    @_instrumented
+    def update_documents_by_query(self, index_name, query, update_script, wait_for_completion=True, slices=None,
+                                  requests_per_second=None, conflicts=None, refresh=None):
+        """
+        Update all documents that match a specific query.
+
+        With wait_for_completion=False the update runs as a background task on the
+        cluster and a TaskHandle is returned immediately, so large indices do not
+        hold the HTTP request open until it times out.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): The query to match documents for update.
+            update_script (dict): The update script to apply to matched documents.
+            wait_for_completion (bool): Block until the update has finished.
+            slices: Number of slices to run in parallel, or 'auto' for one per shard.
+            requests_per_second (float): Throttle for the update. Default is unthrottled.
+            conflicts (str): 'proceed' to skip documents with version conflicts.
+            refresh (bool): Refresh the affected shards once the operation completed.
+
+        Returns:
+            response (dict): Elasticsearch response, or a TaskHandle when not waiting.
+        """
+        try:
+            update_body = {"query": query, "script": update_script}
+            return self._run_by_query("update_by_query", index_name, update_body, wait_for_completion, slices,
+                                      requests_per_second, conflicts, refresh)
+        except Exception as e:
+            print(f"An error occurred while updating documents by query: {e}")
+            return None
+        finally:
+            self._invalidate(index_name)
+
+    @_instrumented
+    def delete_documents_by_query(self, index_name, query, wait_for_completion=True, slices=None,
+                                  requests_per_second=None, conflicts=None, refresh=None):
+        """
+        Delete all documents that match a specific query.
+
+        With wait_for_completion=False the deletion runs as a background task on the
+        cluster and a TaskHandle is returned immediately.
+
+        Parameters:
+            index_name (str): The name of the index.
+            query (dict): The query to match documents for deletion.
+            wait_for_completion (bool): Block until the deletion has finished.
+            slices: Number of slices to run in parallel, or 'auto' for one per shard.
+            requests_per_second (float): Throttle for the deletion. Default is unthrottled.
+            conflicts (str): 'proceed' to skip documents with version conflicts.
+            refresh (bool): Refresh the affected shards once the operation completed.
+
+        Returns:
+            response (dict): Elasticsearch response, or a TaskHandle when not waiting.
+        """
+        try:
+            return self._run_by_query("delete_by_query", index_name, {"query": query}, wait_for_completion, slices,
+                                      requests_per_second, conflicts, refresh)
+        except Exception as e:
+            print(f"An error occurred while deleting documents by query: {e}")
+            return None
+        finally:
+            self._invalidate(index_name)
+
+    def _run_by_query(self, action, index_name, body, wait_for_completion, slices, requests_per_second, conflicts,
+                      refresh=None):
+        params = {"wait_for_completion": wait_for_completion}
+        if refresh:
+            # the by-query APIs only support an immediate refresh, so "wait_for" refreshes too
+            params["refresh"] = True
+        if slices is not None:
+            params["slices"] = slices
+        if requests_per_second is not None:
+            params["requests_per_second"] = requests_per_second
+        if conflicts is not None:
+            params["conflicts"] = conflicts
+
+        response = getattr(self.client, action)(index=index_name, body=body, **params)
+        if wait_for_completion:
+            return response
+        return TaskHandle(self, response["task"], action, index_name)
+    
+    @_instrumented
+    def start_reindex(self, source_index, target_index, query=None, script=None, slices="auto",
+                      requests_per_second=None):
+        """
+        Copy documents from one index to another on the cluster, in the background.
+
+        The copy runs as a server-side _reindex task, so documents never pass
+        through this process. With slices it is split into parallel sub-tasks, by
+        default one per shard of the source.
+
+        Parameters:
+            source_index (str): The index to copy from.
+            target_index (str): The index to copy into.
+            query (dict): Optional query selecting the documents to copy.
+            script (dict): Optional script transforming each document on the way.
+            slices: Number of slices to run in parallel, or 'auto' for one per shard.
+            requests_per_second (float): Throttle for the copy. Default is unthrottled.
+
+        Returns:
+            task (TaskHandle): Handle to track, rethrottle or cancel the reindex.
+        """
+        try:
+            body = {"source": {"index": source_index}, "dest": {"index": target_index}}
+            if query is not None:
+                body["source"]["query"] = query
+            if script is not None:
+                body["script"] = script
+            params = {"wait_for_completion": False, "slices": slices}
+            if requests_per_second is not None:
+                params["requests_per_second"] = requests_per_second
+            response = self.client.reindex(body=body, **params)
+            return TaskHandle(self, response["task"], "reindex", target_index)
+        except Exception as e:
+            print(f"An error occurred while starting reindex: {e}")
+            return None
+
+    @_instrumented
+    def swap_alias(self, alias_name, index_name, delete_old=False):
+        """
+        Point an alias at a single index, in one atomic step.
+
+        The index becomes the alias's write index and every index the alias pointed
+        to before is removed from it, so readers and writers switch over without
+        ever seeing both or neither. If alias_name is still a concrete index, as
+        when migrating from plain indices, that index is deleted in the same step,
+        because an alias cannot share its name.
+
+        Parameters:
+            alias_name (str): The name of the alias.
+            index_name (str): The index the alias should point to.
+            delete_old (bool): Delete the indices the alias pointed to before.
+
+        Returns:
+            response (dict): Elasticsearch response.
+        """
+        try:
+            is_alias = self.client.indices.exists_alias(name=alias_name)
+            old_indices = [name for name in self._resolve_alias(alias_name) if name != index_name]
+            actions = [{"add": {"index": index_name, "alias": alias_name, "is_write_index": True}}]
+            if is_alias:
+                actions += [{"remove": {"index": name, "alias": alias_name}} for name in old_indices]
+            else:
+                actions += [{"remove_index": {"index": name}} for name in old_indices]
+            response = self.client.indices.update_aliases(body={"actions": actions})
+
+            if delete_old and old_indices and is_alias:
+                self.client.indices.delete(index=",".join(old_indices))
+            return response
+        except Exception as e:
+            print(f"An error occurred while swapping alias: {e}")
+            return None
+        finally:
+            self._invalidate(alias_name)
+
+    @_instrumented
+    def reindex_with_alias(self, alias_name, mappings=None, settings=None, query=None, script=None, slices="auto",
+                           requests_per_second=None, delete_old=False, bulk_load=True, poll_interval=5.0,
+                           timeout=None, on_progress=None):
+        """
+        Rebuild the index behind an alias with new mappings or settings, without downtime.
+
+        A new versioned index (alias_v1, alias_v2, ...) is created, filled by a
+        sliced server-side reindex from the index the alias points to, and the alias
+        is then swapped over to it atomically. Readers keep using the old index until
+        the swap. Writes made through the alias while the reindex runs are not
+        copied, so pause writers or replay them afterwards. The alias is only swapped
+        if the reindex completed without failures. A reindex that does not complete
+        within timeout, or cannot be tracked, is cancelled and its half-filled target
+        index deleted; if cancelling fails too, the target is left for the caller.
+
+        Parameters:
+            alias_name (str): The alias to rebuild. May still be a concrete index,
+                which is then replaced by the alias.
+            mappings (dict): Mappings of the new index. Default is the current mappings.
+            settings (dict): Settings of the new index. Default is the current
+                settings, including analysis, without those Elasticsearch sets itself.
+            query (dict): Optional query selecting the documents to keep.
+            script (dict): Optional script transforming each document on the way.
+            slices: Number of slices to run in parallel, or 'auto' for one per shard.
+            requests_per_second (float): Throttle for the reindex. Default is unthrottled.
+            delete_old (bool): Delete the old index after the swap.
+            bulk_load (bool): Turn refresh and replicas off on the new index while it
+                is filled, as bulk_load_mode does.
+            poll_interval (float): Seconds between progress polls.
+            timeout (float): Seconds to wait for the reindex. Default is no limit.
+            on_progress (callable): Optional callback given the progress summary after
+                every poll.
+
+        Returns:
+            response (dict): The source and target index, the reindex task's final
+            response, whether the alias was swapped and whether the target index was
+            deleted again.
+        """
+        try:
+            source_indices = self._resolve_alias(alias_name)
+            if not source_indices:
+                print(f"Alias or index '{alias_name}' not found.")
+                return None
+            target_index = self._next_index_version(alias_name)
+
+            if mappings is None or settings is None:
+                current = self.client.indices.get(index=source_indices[0])[source_indices[0]]
+                if mappings is None:
+                    mappings = current["mappings"]
+                if settings is None:
+                    settings = {"index": _copyable_index_settings(current["settings"])}
+            self.client.indices.create(index=target_index, body={"mappings": mappings, "settings": settings})
+
+            summary = {"source": source_indices, "target": target_index, "response": None, "swapped": False,
+                       "target_deleted": False}
+            load_mode = self.bulk_load_mode(target_index) if bulk_load else contextlib.nullcontext()
+            with load_mode:
+                task = self.start_reindex(",".join(source_indices), target_index, query, script, slices,
+                                          requests_per_second)
+                stopped = True
+                if task is not None:
+                    summary["task"] = task
+                    summary["response"] = task.wait(poll_interval, timeout, on_progress)
+                    if summary["response"] is None:
+                        # a reindex that timed out or could not be tracked would go on
+                        # writing into the target, so it is stopped before the target goes
+                        stopped = task.cancel(wait_for_completion=True) is not None
+
+            response = summary["response"]
+            if response is None and stopped:
+                self.client.indices.delete(index=target_index)
+                summary["target_deleted"] = True
+            if response is None or response.get("failures"):
+                print(f"Reindex into '{target_index}' did not complete cleanly, alias '{alias_name}' left as is.")
+                return summary
+            summary["swapped"] = self.swap_alias(alias_name, target_index, delete_old) is not None
+            return summary
+        except Exception as e:
+            print(f"An error occurred while reindexing with alias: {e}")
+            return None
+
+    def _resolve_alias(self, alias_name):
+        """
+        Get the names of the indices an alias points to, or the index itself if
+        alias_name is a concrete index.
+        """
+        if self.client.indices.exists_alias(name=alias_name):
+            return sorted(self.client.indices.get_alias(name=alias_name))
+        if self.client.indices.exists(index=alias_name):
+            return [alias_name]
+        return []
+
+    def _next_index_version(self, alias_name):
+        """
+        Get the next free versioned index name for an alias, e.g. 'products_v3'.
+        """
+        pattern = re.compile(rf"{re.escape(alias_name)}_v(\d+)")
+        existing = self.client.indices.get(index=f"{alias_name}_v*", allow_no_indices=True, ignore_unavailable=True)
+        versions = [int(match.group(1)) for match in map(pattern.fullmatch, existing) if match]
+        return f"{alias_name}_v{max(versions, default=0) + 1}"
+
+    @_instrumented
+    def count_documents_by_query(self, index_name, field_name, desired_value):
+        """
+        Count the number of documents that match a specific query.
+
+        Parameters:
+            field_name (str): field_name.
+            desired_value (str): desired_value
+        Returns:
+            resppnse (int): Number of documents that match the query.
+        """
+        try:
+            query = {
+                "query": {
+                    "match": {
+                        field_name: desired_value
+                    }
+                }
+            }
+            response = self.client.count(index=index_name, body=query)
+            return response['count']
+        except Exception as e:
+            print(f"An error occurred while counting documents by query: {e}")
+            return None
+        
+    
+    @_instrumented
+    def get_multiple_documents(self, index_name, doc_ids, chunk_size=1000, workers=1, source_includes=None,
+                               source_excludes=None):
+        """
+        Get many documents by ID through bounded _mget requests.
+
+        IDs are consumed lazily and fetched in chunks, optionally with several chunks
+        in flight at once. Results are streamed in the order of the input IDs, so
+        memory stays bounded by the chunks in flight. A failed _mget request is
+        raised rather than ending the iteration early.
+
+        Parameters:
+            index_name (str): The name of the index.
+            doc_ids (iterable): Document IDs to fetch.
+            chunk_size (int): Maximum number of IDs per _mget request.
+            workers (int): Number of chunks fetched concurrently.
+            source_includes (list): Optional fields to include in each _source.
+            source_excludes (list): Optional fields to exclude from each _source.
+
+        Yields:
+            doc (dict): The _mget entry for each ID, in input order. Missing
+            documents have "found" set to False and no "_source".
+        """
+        try:
+            params = {}
+            if source_includes is not None:
+                params["_source_includes"] = source_includes
+            if source_excludes is not None:
+                params["_source_excludes"] = source_excludes
+
+            def fetch(ids):
+                return self.client.mget(body={"ids": ids}, index=index_name, **params)["docs"]
+
+            doc_ids = iter(doc_ids)
+            chunks = iter(lambda: list(itertools.islice(doc_ids, chunk_size)), [])
+            if workers <= 1:
+                for ids in chunks:
+                    yield from fetch(ids)
+                return
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for ids in chunks:
+                    pending.append(executor.submit(contextvars.copy_context().run, fetch, ids))
+                    if len(pending) >= workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+        except Exception as e:
+            print(f"An error occurred while getting multiple documents: {e}")
+            raise
+
+
+class AsyncElasticsearchInterface:
     """
-    A class that provides an interface to interact with Elasticsearch.
+    An asyncio interface to interact with Elasticsearch.
+
+    Offers the same methods as ElasticsearchInterface as coroutines, backed by the
+    async Elasticsearch transport. All calls made through one instance share the
+    same connection pool, so many requests can be awaited concurrently, for example
+    with asyncio.gather or search_many.
+
+    Requires the async extra: pip install elasticsearch[async]
 
     Parameters:
         host (str): The Elasticsearch host. Default is 'localhost'.
         port (int): The Elasticsearch port. Default is 9200.
+        metrics (Metrics): Optional recorder, as for ElasticsearchInterface.
+        tracer: Optional OpenTelemetry tracer, as for ElasticsearchInterface.
+        **transport_options: Same transport settings as ElasticsearchInterface.
     """
-    def __init__(self, host='localhost', port=9200):
+    def __init__(self, host='localhost', port=9200, metrics=None, tracer=None, **transport_options):
+        if AsyncElasticsearch is None:
+            raise ImportError("AsyncElasticsearchInterface requires the elasticsearch[async] extra")
         self.host = host
         self.port = port
-        self.client = Elasticsearch([{'host': self.host, 'port': self.port}])
+        self.metrics = metrics
+        self.tracer = tracer
+        client_hosts, options = _build_transport_options(host, port, **transport_options)
+        self.serializer = options["serializer"]
+        if metrics is not None:
+            options.update(connection_class=InstrumentedAIOHttpConnection, metrics=metrics)
+        self.client = AsyncElasticsearch(client_hosts, **options)
+
+    async def close(self):
+        """
+        Close the connection pool.
+        """
+        await self.client.close()
 
+    async def __aenter__(self):
+        return self
 
-    def create_index(self, index_name):
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @_instrumented
+    async def create_index(self, index_name, mappings=None, settings=None, aliases=None):
         """
         Create an Elasticsearch index.
 
         Parameters:
             index_name (str): The name of the index to create.
+            mappings (dict): Optional mappings.
+            settings (dict): Optional index settings.
+            aliases (dict): Optional aliases to create with the index.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.indices.create(index=index_name)
+            body = _index_body(mappings, settings, aliases)
+            response = await self.client.indices.create(index=index_name, body=body or None)
             return response
         except Exception as e:
             print(f"An error occurred while creating index: {e}")
             return None
 
-    def create_document(self, index_name, doc_id, document):
+    @_instrumented
+    async def create_document(self, index_name, doc_id, document):
         """
         Create a document within an index.
 
@@ -55,13 +3685,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.index(index=index_name, id=doc_id, body=document)
+            response = await self.client.index(index=index_name, id=doc_id, body=document)
             return response
         except Exception as e:
             print(f"An error occurred while creating document: {e}")
             return None
 
-    def delete_index(self, index_name):
+    @_instrumented
+    async def delete_index(self, index_name):
         """
         Delete an Elasticsearch index.
 
@@ -72,13 +3703,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.indices.delete(index=index_name)
+            response = await self.client.indices.delete(index=index_name)
             return response
         except Exception as e:
             print(f"An error occurred while deleting index: {e}")
             return None
 
-    def get_document(self, index_name, doc_id):
+    @_instrumented
+    async def get_document(self, index_name, doc_id):
         """
         Get a document from an Elasticsearch index.
 
@@ -90,13 +3722,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.get(index=index_name, id=doc_id)
+            response = await self.client.get(index=index_name, id=doc_id)
             return response['_source']
         except Exception as e:
             print(f"An error occurred while getting document: {e}")
             return None
 
-    def refresh_index(self, index_name):
+    @_instrumented
+    async def refresh_index(self, index_name):
         """
         Refresh an Elasticsearch index.
 
@@ -107,13 +3740,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.indices.refresh(index=index_name)
+            response = await self.client.indices.refresh(index=index_name)
             return response
         except Exception as e:
             print(f"An error occurred while refreshing index: {e}")
             return None
 
-    def search_document(self, index_name, query):
+    @_instrumented
+    async def search_document(self, index_name, query):
         """
         Search for documents in an Elasticsearch index.
 
@@ -125,13 +3759,36 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.search(index=index_name, body=query)
+            response = await self.client.search(index=index_name, body=query)
             return response['hits']['hits']
         except Exception as e:
             print(f"An error occurred while searching for document: {e}")
             return None
 
-    def update_document(self, index_name, doc_id, updated_document):
+    @_instrumented
+    async def search_many(self, searches, max_concurrency=10):
+        """
+        Run many searches concurrently over the shared connection pool.
+
+        Parameters:
+            searches (list): List of (index_name, query) pairs.
+            max_concurrency (int): Maximum number of searches in flight at once.
+
+        Returns:
+            responses (list): Elasticsearch responses in input order. A search that
+            failed is returned as its exception.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def search(index_name, query):
+            async with semaphore:
+                return await self.client.search(index=index_name, body=query)
+
+        return await asyncio.gather(*(search(index_name, query) for index_name, query in searches),
+                                    return_exceptions=True)
+
+    @_instrumented
+    async def update_document(self, index_name, doc_id, updated_document):
         """
         Update a document in an Elasticsearch index.
 
@@ -144,13 +3801,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.update(index=index_name, id=doc_id, body={"doc": updated_document})
+            response = await self.client.update(index=index_name, id=doc_id, body={"doc": updated_document})
             return response
         except Exception as e:
             print(f"An error occurred while updating document: {e}")
             return None
 
-    def delete_document(self, index_name, doc_id):
+    @_instrumented
+    async def delete_document(self, index_name, doc_id):
         """
         Delete a document from an Elasticsearch index.
 
@@ -162,104 +3820,102 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.delete(index=index_name, id=doc_id)
+            response = await self.client.delete(index=index_name, id=doc_id)
             return response
         except Exception as e:
             print(f"An error occurred while deleting document: {e}")
             return None
-        
-    def create_field_in_document(self, index_name, doc_id, field_name, field_value):
+
+    @_instrumented
+    async def create_field_in_document(self, index_name, doc_id, field_name, field_value):
         """
         Create a new field in a document.
 
         Parameters:
             index_name (str): The name of the index.
             doc_id (str): The ID of the document.
-            field_name (str): The name of the new field.
-            field_value: The value of the new field.
+            field_name (str): The name of the new field. Dots address nested objects.
+            field_value: The value of the new field. Numbers, lists and objects keep their type.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            script = {
-                "source": f"ctx._source.{field_name} = '{field_value}'"
-            }
-            response = self.client.update(index=index_name, id=doc_id, body={"script": script})
+            script = _script(SET_FIELD_SCRIPT, field=field_name, value=field_value)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script})
             return response
         except Exception as e:
             print(f"An error occurred while creating field: {e}")
             return None
-        
-    def delete_field_from_document(self, index_name, doc_id, field_name):
+
+    @_instrumented
+    async def delete_field_from_document(self, index_name, doc_id, field_name):
         """
         Delete a field from a document.
 
         Parameters:
             index_name (str): The name of the index.
             doc_id (str): The ID of the document.
-            field_name (str): The name of the field to delete.
+            field_name (str): The name of the field to delete. Dots address nested objects.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            script = {
-                "source": f"ctx._source.remove('{field_name}')"
-            }
-            response = self.client.update(index=index_name, id=doc_id, body={"script": script})
+            script = _script(REMOVE_FIELD_SCRIPT, field=field_name)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script})
             return response
         except Exception as e:
             print(f"An error occurred while deleting field: {e}")
             return None
-      
-    def update_field_in_document(self, index_name, doc_id, field_name, new_field_value):
+
+    @_instrumented
+    async def update_field_in_document(self, index_name, doc_id, field_name, new_field_value):
         """
         Update the value of a field in a document.
 
         Parameters:
             index_name (str): The name of the index.
             doc_id (str): The ID of the document.
-            field_name (str): The name of the field to update.
-            new_field_value: The new value for the field.
+            field_name (str): The name of the field to update. Dots address nested objects.
+            new_field_value: The new value for the field. Numbers, lists and objects keep their type.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            script = {
-                "source": f"ctx._source.{field_name} = '{new_field_value}'"
-            }
-            response = self.client.update(index=index_name, id=doc_id, body={"script": script})
+            script = _script(SET_FIELD_SCRIPT, field=field_name, value=new_field_value)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script})
             return response
         except Exception as e:
             print(f"An error occurred while updating field: {e}")
             return None
 
-    def create_element_in_object_field(self, index_name, doc_id, object_field_name, element):
+    @_instrumented
+    async def create_element_in_object_field(self, index_name, doc_id, object_field_name, element):
         """
         Create an element in an object field of a document.
 
         Parameters:
             index_name (str): The name of the index.
             doc_id (str): The ID of the document.
-            object_field_name (str): The name of the object field.
-            element: The element to create in the object field.
+            object_field_name (str): The name of the object field. Dots address nested objects.
+            element: The element to create in the object field. Numbers, lists and objects keep their type.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            script = {
-                "source": f"ctx._source.{object_field_name} = '{element}'"
-            }
-            response = self.client.update(index=index_name, id=doc_id, body={"script": script})
+            script = _script(SET_FIELD_SCRIPT, field=object_field_name, value=element)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script})
             return response
         except Exception as e:
             print(f"An error occurred while creating element: {e}")
             return None
-        
-    def delete_element_from_object_field(self, index_name, doc_id, object_field_name, element):
+
+    @_instrumented
+    async def delete_element_from_object_field(self, index_name, doc_id, object_field_name, element,
+                                               retry_on_conflict=3):
         """
         Delete an element from a specified object field of a document.
 
@@ -268,28 +3924,26 @@ class ElasticsearchInterface:
             doc_id (str): The ID of the document.
             object_field_name (str): The name of the object field containing the element.
             element (str): The element to delete from the object field.
+            retry_on_conflict (int): How often the update is retried on version conflicts.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            # First, get the existing document
-            existing_document = self.client.get(index=index_name, id=doc_id)
-
-            # Update the specified object field's list by removing the specified element
-            object_field = existing_document["_source"][object_field_name]
-            object_field.remove(element)
-
-            # Update the document with the modified object field
-            updated_document = {"doc": {object_field_name: object_field}}
-            response = self.client.update(index=index_name, id=doc_id, body=updated_document)
-
+            script = _script(REMOVE_ELEMENT_SCRIPT, field=object_field_name, element=element)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script},
+                                                retry_on_conflict=retry_on_conflict)
+            if response.get("result") == "noop":
+                print(f"The specified element '{element}' was not found.")
+                return None
             return response
         except Exception as e:
             print(f"An error occurred while deleting element: {e}")
             return None
-        
-    def update_element_in_object_field(self, index_name, doc_id, object_field_name, old_element, new_element):
+
+    @_instrumented
+    async def update_element_in_object_field(self, index_name, doc_id, object_field_name, old_element, new_element,
+                                             retry_on_conflict=3):
         """
         Update an element in a specified object field of a document.
 
@@ -299,33 +3953,26 @@ class ElasticsearchInterface:
             object_field_name (str): The name of the object field containing the elements.
             old_element (str): The element to be updated.
             new_element (str): The updated element.
+            retry_on_conflict (int): How often the update is retried on version conflicts.
 
         Returns:
             response (dict): Elasticsearch response.
         """
         try:
-            # First, get the existing document
-            existing_document = self.client.get(index=index_name, id=doc_id)
-
-            # Update the specified object field's list by replacing the old element with the new element
-            object_field = existing_document["_source"][object_field_name]
-            if old_element in object_field:
-                index_of_old_element = object_field.index(old_element)
-                object_field[index_of_old_element] = new_element
-
-                # Update the document with the modified object field
-                updated_document = {"doc": {object_field_name: object_field}}
-                response = self.client.update(index=index_name, id=doc_id, body=updated_document)
-
-                return response
-            else:
+            script = _script(REPLACE_ELEMENT_SCRIPT, field=object_field_name, element=old_element,
+                             new_element=new_element)
+            response = await self.client.update(index=index_name, id=doc_id, body={"script": script},
+                                                retry_on_conflict=retry_on_conflict)
+            if response.get("result") == "noop":
                 print(f"The specified old element '{old_element}' was not found.")
                 return None
+            return response
         except Exception as e:
             print(f"An error occurred while updating element: {e}")
             return None
 
-    def get_full_document_by_id(self, index_name, doc_id):
+    @_instrumented
+    async def get_full_document_by_id(self, index_name, doc_id):
         """
         Get the full document by its ID.
 
@@ -337,13 +3984,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response document data.
         """
         try:
-            response = self.client.get(index=index_name, id=doc_id)
+            response = await self.client.get(index=index_name, id=doc_id)
             return response['_source']
         except Exception as e:
             print(f"An error occurred while getting full document: {e}")
             return None
-            
-    def get_partial_document(self, index_name, doc_id, fields):
+
+    @_instrumented
+    async def get_partial_document(self, index_name, doc_id, fields):
         """
         Get specific fields of a document by its ID.
 
@@ -356,13 +4004,14 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response document data.
         """
         try:
-            response = self.client.get(index=index_name, id=doc_id, _source=fields)
+            response = await self.client.get(index=index_name, id=doc_id, _source=fields)
             return response['_source']
         except Exception as e:
             print(f"An error occurred while getting partial document: {e}")
             return None
-       
-    def search_documents_by_query(self, index_name, query):
+
+    @_instrumented
+    async def search_documents_by_query(self, index_name, query):
         """
         Search for documents using a complex query.
 
@@ -374,16 +4023,19 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            response = self.client.search(index=index_name, body=query)
+            response = await self.client.search(index=index_name, body=query)
             return response
         except Exception as e:
             print(f"An error occurred while searching for documents by query: {e}")
             return None
-      
-    def get_all_documents(self, index_name):
+
+    @_instrumented
+    async def get_all_documents(self, index_name):
         """
         Retrieve all documents from an index.
 
+        Only the first page of hits is returned.
+
         Parameters:
             index_name (str): The name of the index.
 
@@ -392,13 +4044,14 @@ class ElasticsearchInterface:
         """
         try:
             query = {"query": {"match_all": {}}}
-            response = self.client.search(index=index_name, body=query)
-            return response 
+            response = await self.client.search(index=index_name, body=query)
+            return response
         except Exception as e:
             print(f"An error occurred while retrieving all documents: {e}")
             return None
- 
-    def get_documents_by_field_value(self, index_name, field_name, field_value):
+
+    @_instrumented
+    async def get_documents_by_field_value(self, index_name, field_name, field_value):
         """
         Retrieve documents that match a specific field and value.
 
@@ -411,14 +4064,15 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            query = {"query": {"match": {field_name: field_value}}}
-            response = self.client.search(index=index_name, body=query)
+            query = build_field_value_query(field_name, field_value)
+            response = await self.client.search(index=index_name, body=query)
             return response
         except Exception as e:
             print(f"An error occurred while retrieving documents by field value: {e}")
             return None
-      
-    def get_documents_in_field_range(self, index_name, field_name, start_range, end_range):
+
+    @_instrumented
+    async def get_documents_in_field_range(self, index_name, field_name, start_range, end_range):
         """
         Retrieve documents within a specified range of values in a field.
 
@@ -432,14 +4086,15 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            query = {"query": {"range": {field_name: {"gte": start_range, "lte": end_range}}}}
-            response = self.client.search(index=index_name, body=query)
+            query = build_field_range_query(field_name, start_range, end_range)
+            response = await self.client.search(index=index_name, body=query)
             return response
         except Exception as e:
             print(f"An error occurred while retrieving documents within field range: {e}")
             return None
-        
-    def combine_queries_with_boolean_logic(self, index_name, must_queries=None, must_not_queries=None, should_queries=None):
+
+    @_instrumented
+    async def combine_queries_with_boolean_logic(self, index_name, must_queries=None, must_not_queries=None, should_queries=None):
         """
         Combine multiple queries using boolean logic (AND, OR, NOT).
 
@@ -453,23 +4108,15 @@ class ElasticsearchInterface:
             response (dict): Elasticsearch response.
         """
         try:
-            combined_query = {"bool": {}}
-            
-            if must_queries:
-                combined_query["bool"]["must"] = must_queries
-            if must_not_queries:
-                combined_query["bool"]["must_not"] = must_not_queries
-            if should_queries:
-                combined_query["bool"]["should"] = should_queries
-            
-            query = {"query": combined_query}
-            response = self.client.search(index=index_name, body=query)  
+            query = build_boolean_query(must_queries, must_not_queries, should_queries)
+            response = await self.client.search(index=index_name, body=query)
             return response
         except Exception as e:
             print(f"An error occurred while combining queries with boolean logic: {e}")
             return None
 
-    def update_documents_by_query(self, index_name, query, update_script):
+    @_instrumented
+    async def update_documents_by_query(self, index_name, query, update_script):
         """
         Update all documents that match a specific query.
 
@@ -483,54 +4130,51 @@ class ElasticsearchInterface:
         """
         try:
             update_body = {"query": query, "script": update_script}
-            response = self.client.update_by_query(index=index_name, body=update_body)
+            response = await self.client.update_by_query(index=index_name, body=update_body)
             return response
         except Exception as e:
             print(f"An error occurred while updating documents by query: {e}")
             return None
-    
-    def count_documents_by_query(self, index_name, field_name, desired_value):
+
+    @_instrumented
+    async def count_documents_by_query(self, index_name, field_name, desired_value):
         """
         Count the number of documents that match a specific query.
 
         Parameters:
+            index_name (str): The name of the index.
             field_name (str): field_name.
             desired_value (str): desired_value
         Returns:
-            resppnse (int): Number of documents that match the query.
+            response (int): Number of documents that match the query.
         """
         try:
-            query = {
-                "query": {
-                    "match": {
-                        field_name: desired_value
-                    }
-                }
-            }
-            response = self.client.count(index_name, body=query)
+            query = {"query": {"match": {field_name: desired_value}}}
+            response = await self.client.count(index=index_name, body=query)
             return response['count']
         except Exception as e:
             print(f"An error occurred while counting documents by query: {e}")
             return None
-        
-    
-    def get_multiple_documents(self, doc_ids):
+
+    @_instrumented
+    async def get_multiple_documents(self, index_name, doc_ids):
         """
         Get multiple documents in one request.
 
         Parameters:
+            index_name (str): The name of the index.
             doc_ids (list): List of document IDs.
 
         Returns:
             List of retrieved documents.
         """
         try:
-            query = {"ids": {"values": doc_ids}}
-            response = self.client.mget(body=query, index=self.index_name)
+            response = await self.client.mget(body={"ids": list(doc_ids)}, index=index_name)
             return [hit['_source'] for hit in response['docs'] if hit['found']]
         except Exception as e:
             print(f"An error occurred while getting multiple documents: {e}")
             return None
+
 #%%
 # Example usage
 if __name__ == "__main__":
@@ -555,6 +4199,9 @@ if __name__ == "__main__":
 
     #%% refreshing an index
     es_interface.refresh_index(index_name)    
+
+    #%% Making a write searchable as part of the write instead of refreshing afterwards
+    es_interface.create_document(index_name, "2", {"field_1": "value_1"}, refresh="wait_for")
    
     #%% Searching for a document
     query = {"query": {"match": {"field_1": "value_1"}}}
@@ -569,6 +4216,15 @@ if __name__ == "__main__":
     updated_document = es_interface.get_document(index_name, doc_id)
     print("Retrieved Document:", updated_document)
 
+    #%% Updating a document only if nobody else changed it since it was read
+    versioned_document = es_interface.get_versioned_document(index_name, doc_id)
+    es_interface.update_document(index_name, doc_id, {"field_2": "checked_value_2"},
+                                 if_seq_no=versioned_document["_seq_no"],
+                                 if_primary_term=versioned_document["_primary_term"])
+
+    # Retrying a read-modify-write cycle automatically on version conflicts
+    es_interface.read_modify_write_document(index_name, doc_id, lambda source: dict(source, field_1="rmw_value_1"))
+
     #%% Deleting a document
     es_interface.delete_document(index_name, doc_id)
     
@@ -690,6 +4346,9 @@ if __name__ == "__main__":
     getting_document = es_interface.get_document(index_name, doc_id)
     print("Getting Document:", getting_document)
 
+    # Replacing an element in many documents through _bulk update actions
+    es_interface.bulk_update_elements_in_object_field(index_name, [doc_id], object_field_to_update, "val_1", "val_1_new")
+
     #%% get full document by id
     index_name = "example_index_8"
     doc_id = "1"
@@ -765,6 +4424,10 @@ if __name__ == "__main__":
     # Retrieving all documents from the index
     all_documents = es_interface.get_all_documents(index_name)
     print("All Documents:", all_documents)
+
+    # Streaming every document from the index, fetching only the needed fields
+    for hit in es_interface.iter_all_documents(index_name, source=["field1"]):
+        print("Exported Document:", hit["_id"], hit["_source"])
     
     #%% Retrieve documents that match a specific field and value
     index_name = "example_index_12"
@@ -845,6 +4508,19 @@ if __name__ == "__main__":
     update_script = {"source": "ctx._source.views += params.value", "params": {"value": 50}}
     update_response = es_interface.update_documents_by_query(index_name, query_to_match, update_script)
     print("Update Documents by Query Response:", update_response)
+
+    # Running the update as a sliced, throttled background task
+    update_task = es_interface.update_documents_by_query(index_name, query_to_match, update_script,
+                                                         wait_for_completion=False, slices="auto",
+                                                         requests_per_second=500)
+    print("Update Task Progress:", update_task.progress())
+    update_task.rethrottle(-1)
+    print("Update Task Response:", update_task.wait())
+
+    # Deleting documents by query in the background
+    delete_task = es_interface.delete_documents_by_query(index_name, {"range": {"views": {"lt": 200}}},
+                                                         wait_for_completion=False, slices="auto")
+    print("Delete Task Response:", delete_task.wait())
     
     #%% Count the number of documents that match a specific query
     index_name = "example_index_17"
@@ -860,6 +4536,115 @@ if __name__ == "__main__":
     es_interface.create_document(index_name, doc_id_2, document_2)
 
     count = es_interface.count_documents_by_query(index_name,"field1", "value1")
+
+    #%% Bulk index documents from a generator
+    index_name = "example_index_18"
+
+    # Creating an index
+    es_interface.create_index(index_name)
+
+    # Indexing documents in chunks through the _bulk API
+    documents = ({"doc_number": i, "title": f"Example Document {i}"} for i in range(10000))
+    bulk_summary = es_interface.bulk_index_documents(index_name, documents, id_field="doc_number")
+    print("Bulk Indexed:", bulk_summary["indexed"], "Errors:", bulk_summary["errors"])
+
+    #%% Bulk index documents with several requests in flight
+    documents = ({"doc_number": i, "title": f"Example Document {i}"} for i in range(10000, 50000))
+    parallel_summary = es_interface.parallel_bulk_index_documents(index_name, documents, id_field="doc_number", workers=4)
+    print("Parallel Bulk Docs/sec:", parallel_summary["docs_per_second"], "Retries:", parallel_summary["retries"])
+
+    #%% Bulk index a newline-delimited JSON file without decoding it
+    ndjson_path = "example_documents.ndjson"
+    with open(ndjson_path, "w") as ndjson_file:
+        for i in range(50000, 60000):
+            ndjson_file.write(json.dumps({"doc_number": i, "title": f"Example Document {i}"}) + "\n")
+    file_summary = es_interface.bulk_index_file(index_name, ndjson_path, id_field="doc_number")
+    print("File Bulk Indexed:", file_summary["indexed"], "Errors:", file_summary["errors"])
+    os.remove(ndjson_path)
+
+    #%% Load a fresh index with explicit mappings, refresh off and no replicas
+    load_index_name = "example_index_19"
+    es_interface.create_index(load_index_name, mappings={
+        "dynamic": "strict",
+        "properties": {"doc_number": {"type": "long"}, "title": {"type": "text"}},
+    }, settings={"number_of_shards": 1})
+    with es_interface.bulk_load_mode(load_index_name, force_merge=True):
+        documents = ({"doc_number": i, "title": f"Example Document {i}"} for i in range(100000))
+        es_interface.parallel_bulk_index_documents(load_index_name, documents, id_field="doc_number")
+
+    #%% Read hot documents through an in-process cache
+    cached_es_interface = ElasticsearchInterface(document_cache=DocumentCache(max_entries=10000, ttl=60))
+    for _ in range(100):
+        cached_es_interface.get_document(index_name, "1")
+    print("Document Cache Stats:", cached_es_interface.document_cache.stats())
+
+    #%% Serve repeated searches from a cache invalidated by writes and refreshes
+    cached_es_interface = ElasticsearchInterface(search_cache=SearchCache(max_bytes=64 * 1024 * 1024))
+    for _ in range(100):
+        cached_es_interface.get_documents_by_field_value(index_name, "title", "Example Document 1")
+    print("Search Cache Stats:", cached_es_interface.search_cache.stats())
+
+    #%% Run one search per filter in a single _msearch round trip
+    searches = [(index_name, build_field_value_query("doc_number", i)) for i in range(20)]
+    multi_search_results = es_interface.multi_search(searches)
+    print("Multi Search Results:", [len(response['hits']['hits']) for response in multi_search_results])
+
+    #%% Stream many documents by ID through chunked _mget requests
+    for doc in es_interface.get_multiple_documents(index_name, (str(i) for i in range(50000)), workers=4):
+        if not doc["found"]:
+            print("Missing Document:", doc["_id"])
+
+    #%% Aggregate with nested sub-aggregations
+    aggs = AggregationBuilder()
+    aggs.histogram("doc_number_ranges", "doc_number", 1000).stats("stats_on_doc_number", "doc_number")
+    print("Aggregations:", es_interface.aggregate(index_name, aggs))
+
+    # Paging through every bucket of a high-cardinality group-by
+    for bucket in es_interface.iter_composite_buckets(index_name, [("title", "title.keyword")]):
+        print("Bucket:", bucket["key"], bucket["doc_count"])
+
+    #%% Export hits as typed columns instead of lists of dicts
+    for batch in es_interface.iter_column_batches(index_name, ["doc_number", "title"], output="numpy"):
+        print("Column Batch:", len(batch["_id"]), batch["doc_number"].dtype)
+
+    #%% Coalesce frequent partial updates of the same documents
+    buffered_es_interface = ElasticsearchInterface(write_behind=WriteBehindBuffer(flush_interval=0.5))
+    futures = [buffered_es_interface.update_field_in_document(index_name, str(i % 10), "views", i) for i in range(1000)]
+    futures[-1].result()
+    buffered_es_interface.write_behind.close()
+    print("Write-Behind Stats:", buffered_es_interface.write_behind.stats())
+
+    #%% Profile a sample of searches and log the slow ones
+    logging.basicConfig()
+    profiled_es_interface = ElasticsearchInterface(query_profiler=QueryProfiler(sample_rate=0.1, slow_threshold_ms=50))
+    for i in range(100):
+        profiled_es_interface.get_documents_in_field_range(index_name, "doc_number", i, i + 1000)
+    print("Slowest Shards:", profiled_es_interface.query_profiler.profiles[-1]["profile"][:3])
+    print("Most Expensive Query Shapes:", profiled_es_interface.query_profiler.top_shapes(3))
+
+    #%% Record per-method latency, took, response sizes and errors
+    metrics = Metrics()
+    instrumented_es_interface = ElasticsearchInterface(metrics=metrics)
+    instrumented_es_interface.search_documents_by_query(index_name, {"query": {"match_all": {}}})
+    instrumented_es_interface.get_document(index_name, "does-not-exist")
+    print(metrics.to_prometheus())
+
+    #%% Rebuild an index with new mappings behind an alias, without downtime
+    es_interface.create_index("products")
+    es_interface.bulk_index_documents("products", ({"doc_number": i, "make": "honda"} for i in range(10000)))
+    reindex_summary = es_interface.reindex_with_alias(
+        "products", mappings={"properties": {"doc_number": {"type": "long"}, "make": {"type": "keyword"}}},
+        requests_per_second=5000, delete_old=True, on_progress=lambda progress: print("Reindexed:", progress["fraction"]))
+    print("Now serving products from:", reindex_summary["target"], "Swapped:", reindex_summary["swapped"])
+
+    #%% Fan out many searches concurrently with the asyncio interface
+    async def run_searches():
+        async with AsyncElasticsearchInterface() as async_es_interface:
+            searches = [(index_name, {"query": {"match": {"doc_number": i}}}) for i in range(20)]
+            return await async_es_interface.search_many(searches)
+
+    search_responses = asyncio.run(run_searches())
+    print("Async Search Results:", [len(response['hits']['hits']) for response in search_responses])
     
     
     
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression tests for the ElasticsearchInterface module, run against the
+in-process stand-in cluster from benchmark.py, so no cluster is needed.
+
+usage: python -m unittest test_main
+"""
+#imports
+import time
+import unittest
+from unittest import mock
+
+from benchmark import FakeElasticsearch
+import main
+from main import ElasticsearchInterface, OrjsonSerializer, SearchCache, WriteBehindBuffer, orjson
+
+
+class WriteBehindBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.cluster = FakeElasticsearch().__enter__()
+        self.addCleanup(self.cluster.__exit__, None, None, None)
+        self.buffer = WriteBehindBuffer(flush_interval=0.2)
+        self.addCleanup(self.buffer.close)
+        self.es_interface = ElasticsearchInterface(self.cluster.host, self.cluster.port, write_behind=self.buffer)
+        self.es_interface.create_index("test")
+        self.es_interface.create_document("test", "1", {"views": 0})
+
+    def test_every_batch_is_flushed_after_flush_interval(self):
+        for views in (1, 2):
+            future = self.es_interface.update_document("test", "1", {"views": views})
+            future.result(timeout=3)
+            self.assertEqual(self.cluster.indices["test"]["1"]["_source"]["views"], views)
+            time.sleep(0.5)
+        self.assertEqual(self.buffer.stats()["pending"], 0)
+
+    def test_field_updates_replace_objects_as_without_the_buffer(self):
+        self.es_interface.update_field_in_document("test", "1", "meta", {"a": 1, "b": 2})
+        self.buffer.flush()
+        self.es_interface.update_field_in_document("test", "1", "meta", {"a": 9})
+        self.buffer.flush()
+        self.assertEqual(self.cluster.indices["test"]["1"]["_source"]["meta"], {"a": 9})
+
+        direct_es_interface = ElasticsearchInterface(self.cluster.host, self.cluster.port)
+        direct_es_interface.update_field_in_document("test", "1", "meta", {"a": 1, "b": 2})
+        direct_es_interface.update_field_in_document("test", "1", "meta", {"a": 9})
+        self.assertEqual(self.cluster.indices["test"]["1"]["_source"]["meta"], {"a": 9})
+
+    def test_refresh_bypasses_the_buffer(self):
+        response = self.es_interface.update_document("test", "1", {"views": 1}, refresh="wait_for")
+        self.assertEqual(response["result"], "updated")
+        self.assertEqual(self.buffer.stats()["pending"], 0)
+
+
+class SearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cluster = FakeElasticsearch().__enter__()
+        self.addCleanup(self.cluster.__exit__, None, None, None)
+        self.es_interface = ElasticsearchInterface(self.cluster.host, self.cluster.port, search_cache=SearchCache())
+        self.es_interface.create_index("test")
+
+    def test_auto_id_bulk_index_makes_cached_searches_stale(self):
+        query = {"query": {"match_all": {}}}
+        self.assertEqual(len(self.es_interface.search_documents_by_query("test", query)["hits"]["hits"]), 0)
+        self.es_interface.bulk_index_documents("test", [{"views": views} for views in range(3)], refresh=True)
+        self.assertEqual(len(self.es_interface.search_documents_by_query("test", query)["hits"]["hits"]), 3)
+
+    def test_searches_are_not_cached_until_a_write_is_refreshed(self):
+        query = {"query": {"match_all": {}}}
+        self.es_interface.create_document("test", "1", {"views": 0})
+        for _ in range(2):
+            self.es_interface.search_documents_by_query("test", query)
+        self.assertEqual(self.es_interface.search_cache.stats()["hits"], 0)
+
+        self.es_interface.refresh_index("test")
+        for _ in range(2):
+            self.es_interface.search_documents_by_query("test", query)
+        self.assertEqual(self.es_interface.search_cache.stats()["hits"], 1)
+
+    def test_searches_are_cached_again_after_refresh_interval(self):
+        self.es_interface.search_cache.refresh_interval = 0.2
+        query = {"query": {"match_all": {}}}
+        self.es_interface.create_document("test", "1", {"views": 0})
+        time.sleep(0.3)
+        for _ in range(2):
+            self.es_interface.search_documents_by_query("test", query)
+        self.assertEqual(self.es_interface.search_cache.stats()["hits"], 1)
+
+
+class StreamingReadTest(unittest.TestCase):
+    def setUp(self):
+        self.cluster = FakeElasticsearch().__enter__()
+        self.addCleanup(self.cluster.__exit__, None, None, None)
+        self.es_interface = ElasticsearchInterface(self.cluster.host, self.cluster.port, max_retries=0)
+        self.es_interface.create_index("test")
+        self.es_interface.bulk_index_documents("test", ({"doc_number": i} for i in range(10)), id_field="doc_number")
+
+    def assert_raises_when_cut_short(self, documents):
+        next(documents)
+        failure = (500, {"error": {"type": "internal_server_error"}, "status": 500})
+        with mock.patch.object(self.cluster, "handle", return_value=failure):
+            with self.assertRaises(Exception):
+                list(documents)
+
+    def test_iter_all_documents_raises_when_cut_short(self):
+        self.assert_raises_when_cut_short(self.es_interface.iter_all_documents("test", page_size=2))
+
+    def test_get_multiple_documents_raises_when_cut_short(self):
+        self.assert_raises_when_cut_short(
+            self.es_interface.get_multiple_documents("test", map(str, range(10)), chunk_size=2))
+
+
+@unittest.skipIf(orjson is None, "requires orjson")
+class OrjsonSerializerTest(unittest.TestCase):
+    def test_encodes_what_json_serializer_accepts(self):
+        serializer = OrjsonSerializer()
+        self.assertEqual(serializer.dumps({1: "a"}), b'{"1":"a"}')
+        self.assertEqual(serializer.dumps({"n": 2 ** 70}), '{"n":1180591620717411303424}')
+
+
+@unittest.skipIf(main.pa is None, "requires pyarrow")
+class ArrowColumnsTest(unittest.TestCase):
+    def test_arrow_output_does_not_need_numpy(self):
+        with mock.patch.object(main, "np", None):
+            batch = main._build_columns({"doc_number": [1, None], "sold": [1700000000000, None]},
+                                        {"doc_number": "long", "sold": "date"}, "arrow")
+        self.assertEqual(str(batch.schema.field("doc_number").type), "int64")
+        self.assertEqual(str(batch.schema.field("sold").type), "timestamp[ms]")
+
+    def test_types_without_a_dtype_are_inferred(self):
+        batch = main._build_columns({"words": [3, None], "location": [{"lat": 1.5, "lon": 2.5}, "1.5,2.5"],
+                                     "make": [None, None]},
+                                    {"words": "token_count", "location": "geo_point", "make": "keyword"}, "arrow")
+        self.assertEqual(str(batch.schema.field("words").type), "int64")
+        self.assertEqual(str(batch.schema.field("location").type), "string")
+        self.assertEqual(str(batch.schema.field("make").type), "string")
+
+
+if __name__ == "__main__":
+    unittest.main()